@@ -28,6 +28,7 @@ bl_info = {
 }
 
 import bpy
+import numpy as np
 from bpy.types import Panel, PropertyGroup, Operator
 from bpy.props import FloatProperty, PointerProperty
 
@@ -47,27 +48,46 @@ STATE = BlendInteractionState()
 # DATA STRUCTURES
 # ---------------------------------------------------------------------------
 
-class CachedKeyframe:
-    def __init__(self, fcurve, index, y_start, y_target):
+class CachedCurve:
+    """The blended keys of one F-Curve: arrays read once, written back in one go."""
+
+    def __init__(self, fcurve, co, indices, y_target):
         self.fcurve = fcurve
-        self.index = index
-        self.y_start = y_start
+        self.co = co              # (n, 2) array of every key's co
+        self.indices = indices
+        self.y_start = co[indices, 1].copy()
         self.y_target = y_target
 
+    def _write(self, y):
+        # only co.y changes, handles stay where they are
+        co = self.co.copy()
+        co[self.indices, 1] = y
+        self.fcurve.keyframe_points.foreach_set("co", co.ravel())
+
     def restore(self):
-        self.fcurve.keyframe_points[self.index].co.y = self.y_start
+        self._write(self.y_start)
 
     def apply(self, factor):
-        y = self.y_start + (self.y_target - self.y_start) * factor
-        self.fcurve.keyframe_points[self.index].co.y = y
+        self._write(self.y_start + (self.y_target - self.y_start) * factor)
 
 
 # ---------------------------------------------------------------------------
 # KEYFRAME COLLECTION
 # ---------------------------------------------------------------------------
 
+def read_keyframes(fc):
+    """co array ((n, 2) float32) and the select flags of an F-Curve's keys."""
+    points = fc.keyframe_points
+    n = len(points)
+    co = np.empty(n * 2, dtype=np.float32)
+    points.foreach_get("co", co)
+    selected = np.empty(n, dtype=bool)
+    points.foreach_get("select_control_point", selected)
+    return co.reshape(n, 2), selected
+
 
 def collect_keyframes(context):
+    """(fcurve, co array, indices of the keys to blend) per F-Curve: selected keys, else keys on the current frame."""
     scene = context.scene
     frame = scene.frame_current
     collected = []
@@ -78,19 +98,15 @@ def collect_keyframes(context):
             continue
 
         for fc in ad.action.fcurves:
-            if fc.lock or fc.mute:
+            if fc.lock or fc.mute or not len(fc.keyframe_points):
                 continue
 
-            selected = [i for i, k in enumerate(fc.keyframe_points)
-                        if k.select_control_point]
-
-            if selected:
-                for i in selected:
-                    collected.append((fc, i))
-            else:
-                for i, k in enumerate(fc.keyframe_points):
-                    if k.co.x == frame:
-                        collected.append((fc, i))
+            co, selected = read_keyframes(fc)
+            indices = np.flatnonzero(selected)
+            if not len(indices):
+                indices = np.flatnonzero(co[:, 0] == frame)
+            if len(indices):
+                collected.append((fc, co, indices))
 
     return collected
 
@@ -100,44 +116,30 @@ def collect_keyframes(context):
 # ---------------------------------------------------------------------------
 
 
-def get_neighbors(keys, i):
-    prev_k = keys[i - 1] if i > 0 else None
-    next_k = keys[i + 1] if i < len(keys) - 1 else None
-    return prev_k, next_k
-
-
-def linear_target(prev_k, next_k, x):
-    if not prev_k or not next_k:
-        return None
-    x0, y0 = prev_k.co
-    x1, y1 = next_k.co
-    if x1 == x0:
-        return y0
-    t = (x - x0) / (x1 - x0)
-    return y0 + (y1 - y0) * t
-
-
-def compute_target(fc, idx, mode, to_value):
-    keys = fc.keyframe_points
-    cur = keys[idx]
-    x = cur.co.x
-    prev_k, next_k = get_neighbors(keys, idx)
+def compute_targets(co, indices, mode, to_value):
+    """Target values of the keys at indices, given the curve's (n, 2) co array."""
+    x, y = co[:, 0], co[:, 1]
+    cur = y[indices]
+    prev_i = np.maximum(indices - 1, 0)
+    next_i = np.minimum(indices + 1, len(co) - 1)
+    has_prev = indices > 0
+    has_next = indices < len(co) - 1
 
     if mode == 'NEXT':
-        return next_k.co.y if next_k else cur.co.y
-    if mode == 'PREV':
-        return prev_k.co.y if prev_k else cur.co.y
-    if mode == 'LINEAR':
-        y = linear_target(prev_k, next_k, x)
-        return y if y is not None else cur.co.y
-    if mode == 'EASE':
-        y = linear_target(prev_k, next_k, x)
-        return (cur.co.y + y) * 0.5 if y is not None else cur.co.y
-    if mode == 'CONSTANT':
-        return prev_k.co.y if prev_k else cur.co.y
+        return np.where(has_next, y[next_i], cur)
+    if mode == 'PREV' or mode == 'CONSTANT':
+        return np.where(has_prev, y[prev_i], cur)
+    if mode == 'LINEAR' or mode == 'EASE':
+        x0, y0, x1, y1 = x[prev_i], y[prev_i], x[next_i], y[next_i]
+        span = x1 - x0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            line = np.where(span == 0, y0, y0 + (y1 - y0) * (x[indices] - x0) / span)
+        if mode == 'EASE':
+            line = (cur + line) * 0.5
+        return np.where(has_prev & has_next, line, cur)
     if mode == 'VALUE':
-        return to_value
-    return cur.co.y
+        return np.full(len(indices), to_value, dtype=np.float32)
+    return cur.copy()
 
 
 # ---------------------------------------------------------------------------
@@ -152,10 +154,9 @@ def begin_interaction(context, mode):
 
     props = context.scene.graph_blend_props
 
-    for fc, idx in collect_keyframes(context):
-        k = fc.keyframe_points[idx]
-        target = compute_target(fc, idx, mode, props.to_value)
-        STATE.cache.append(CachedKeyframe(fc, idx, k.co.y, target))
+    for fc, co, indices in collect_keyframes(context):
+        target = compute_targets(co, indices, mode, props.to_value)
+        STATE.cache.append(CachedCurve(fc, co, indices, target))
 
 
 def apply_interaction(factor):
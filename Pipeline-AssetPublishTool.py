@@ -10,37 +10,76 @@ bl_info = {
 
 import bpy
 import os
+import sys
+import csv
+import json
+import argparse
+import queue
+import sqlite3
+import subprocess
+import tempfile
+import threading
+import time
 # from pathlib import Path # Not used
 from bpy.types import Panel, Operator, PropertyGroup
-from bpy.props import StringProperty, EnumProperty, PointerProperty
+from bpy.props import StringProperty, EnumProperty, PointerProperty, BoolProperty
+
+# Shared modules (pipeline_storage.py) live next to the add-ons
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+from pipeline_storage import (
+    get_watcher, stop_watcher, is_listed_folder,
+    parse_version_filename, load_version_index, rebuild_version_index, record_saved_version,
+    DEDUP_STORE_DIRNAME, materialize_version, restore_deduplicated_versions, dedup_older_versions,
+    SAVE_POLICIES, save_blend, submit_post_save, queue_recompress, recompress_blend, file_sha256,
+    RECOMPRESS_FALLBACK_MESSAGE, recompress_backend, recompress_fallback, save_compressed,
+    shutdown_post_save_pool, SeriesCatalog,
+    get_catalog, search_catalog, close_catalogs, get_latest_version,
+)
+
+WATCH_CLIENT = __name__ # this add-on's name towards the shared directory watcher
 
 # ----------- Settings ------------
 TASK_LIST = [("Rig", "Rig", ""), ("Model", "Model", ""), ("Shade", "Shade", "")]
+ASSET_CATALOG_ROOTS = ("wip/Assets", "publish/Assets") # Catalog trees the panel's search looks in
 # ----------------------------------
 
 # --- Global storage for dynamic enum items ---
 _dynamic_asset_enum_items = []
 
+# --- Background asset scan state ---
+# Only the scan whose generation matches the current one may publish its result;
+# starting a new scan bumps the generation, which also tells older workers to stop.
+_asset_scan_lock = threading.Lock()
+_asset_scan = {"generation": 0, "result": None, "select": None, "folder": None, "watched": None}
+
 # --- Helper Functions ---
 def list_assets(directory):
     """Helper to list folders (assets) in a given directory."""
-    if not os.path.exists(directory):
-        return []
-    return [(asset, asset, "") for asset in os.listdir(directory) if os.path.isdir(os.path.join(directory, asset))]
+    watcher = get_watcher(WATCH_CLIENT, start=False)
+    names = watcher.listing(directory) if watcher is not None else None # Kept current by the watcher
+    if names is None:
+        if not os.path.exists(directory):
+            return []
+        names = [asset for asset in os.listdir(directory)
+                 if is_listed_folder(asset) and os.path.isdir(os.path.join(directory, asset))]
+    return [(asset, asset, "") for asset in names]
 
 def get_next_increment_filename(folder, base_name):
     """Find next available incremental filename like base_name_v001.blend"""
     if not os.path.isdir(folder):
         os.makedirs(folder, exist_ok=True) # Ensure folder exists before trying to list its contents
         return f"{base_name}_v001.blend"
-    existing = [f for f in os.listdir(folder) if f.startswith(base_name) and f.endswith(".blend")]
-    numbers = []
-    for f in existing:
-        parts = f.replace(".blend", "").split("_v")
-        if len(parts) > 1 and parts[-1].isdigit():
-            numbers.append(int(parts[-1]))
-    next_number = max(numbers, default=0) + 1
-    return f"{base_name}_v{str(next_number).zfill(3)}.blend"
+    versions = load_version_index(folder)
+    next_number = versions.get(base_name, [0])[0] + 1
+    filename = f"{base_name}_v{str(next_number).zfill(3)}.blend"
+    if os.path.exists(os.path.join(folder, filename)):
+        # Index missed a save (e.g. same-second write on a coarse-mtime share); rescan once
+        versions = rebuild_version_index(folder)
+        next_number = versions.get(base_name, [0])[0] + 1
+        filename = f"{base_name}_v{str(next_number).zfill(3)}.blend"
+    return filename
 
 def ensure_directories(asset_root_abs, asset_name):
     """Ensure asset directories exist for wip, publish, and asset library."""
@@ -53,22 +92,6 @@ def ensure_directories(asset_root_abs, asset_name):
     os.makedirs(publish_dir, exist_ok=True)
     os.makedirs(assetlib_dir, exist_ok=True)
 
-def get_latest_version(directory, base_name):
-    """Find the latest version of a .blend file based on the _v### suffix."""
-    if not os.path.isdir(directory):
-        return None
-    latest_version = None
-    latest_number = -1
-    for filename in os.listdir(directory):
-        if filename.startswith(base_name) and filename.endswith(".blend"):
-            parts = filename.replace(".blend", "").split("_v")
-            if len(parts) > 1 and parts[-1].isdigit():
-                version_number = int(parts[-1])
-                if version_number > latest_number:
-                    latest_number = version_number
-                    latest_version = filename
-    return os.path.join(directory, latest_version) if latest_version else None
-
 # --- Dynamic Enum Callbacks & Updaters ---
 def get_asset_enum_items(self, context):
     """Callback for EnumProperty items to dynamically list assets."""
@@ -78,43 +101,264 @@ def get_asset_enum_items(self, context):
         return [("NONE", "Initializing or no directory set...", "")]
     return _dynamic_asset_enum_items
 
-def update_asset_list_and_dependent_props(self, context):
-    """Called when directory_path changes. Updates the global list for asset_enum."""
+def _scan_assets_worker(generation, series_root):
+    """Worker thread: build the asset enum items from the series catalog. Must not touch bpy."""
+    wip_scan_path = os.path.join(series_root, "wip", "Assets")
+    if not os.path.isdir(wip_scan_path):
+        print(f"Asset scan: WIP Series Directory not found: {wip_scan_path}. Will be created if saving an asset.")
+        items = [("NONE", "No assets (WIP folder missing/empty)", f"Path: {wip_scan_path}")]
+    else:
+        superseded = lambda: generation != _asset_scan["generation"]
+        try:
+            with SeriesCatalog(series_root) as catalog:
+                visited, rescanned, seconds = catalog.refresh(("wip/Assets", "publish/Assets"), cancelled=superseded)
+                names = catalog.children("wip/Assets")
+            print(f"Asset scan: catalog refreshed ({rescanned}/{visited} folders re-listed) in {seconds:.3f}s")
+        except (OSError, sqlite3.Error) as e:
+            # No writable catalog (e.g. no local cache folder) - list the folder directly
+            print(f"Asset scan: catalog unavailable ({e}), listing {wip_scan_path}")
+            names = [item[0] for item in list_assets(wip_scan_path)]
+        if superseded():
+            return
+        items = [(name, name, "") for name in names]
+        if not items:
+            items = [("NONE", "No assets found in WIP", f"No subdirectories in {wip_scan_path}")]
+
+    with _asset_scan_lock:
+        if generation == _asset_scan["generation"]:
+            _asset_scan["result"] = items
+
+def _publish_asset_scan():
+    """bpy.app.timers callback: hand a finished scan over to the enum on the main thread."""
+    with _asset_scan_lock:
+        items = _asset_scan["result"]
+        _asset_scan["result"] = None
+        select = _asset_scan["select"]
+        folder = _asset_scan["folder"]
+    if items is None:
+        return 0.1 # Still scanning, poll again
+
+    _set_asset_items(items, select)
+
+    # From now on the watcher keeps the list current
+    watcher = get_watcher(WATCH_CLIENT)
+    if watcher is not None and os.path.isdir(folder):
+        if _asset_scan["watched"] not in (None, folder):
+            watcher.unwatch(_asset_scan["watched"], WATCH_CLIENT)
+        watcher.watch(folder, [item[0] for item in items if item[0] != "NONE"], WATCH_CLIENT)
+        _asset_scan["watched"] = folder
+        if not bpy.app.timers.is_registered(_apply_asset_watch_events):
+            bpy.app.timers.register(_apply_asset_watch_events, first_interval=1.0)
+    return None
+
+def _set_asset_items(items, select):
+    """Swap in new asset enum items and keep (or move) the selection. Main thread only."""
     global _dynamic_asset_enum_items
 
-    current_asset_selection = self.asset_enum
+    _dynamic_asset_enum_items = items
 
-    if self.directory_path:
-        abs_path = bpy.path.abspath(self.directory_path)
-        # Modified scan path
-        wip_scan_path = os.path.join(abs_path, "wip", "Assets")
+    props = getattr(bpy.context.scene, "asset_selector_props", None)
+    if props is not None:
+        identifiers = [item[0] for item in items]
+        if select in identifiers:
+            props.asset_enum = select
+        elif identifiers[0] == "NONE":
+            props.asset_enum = "NONE"
+        props.update_asset()
 
-        if not os.path.isdir(wip_scan_path):
-            print(f"Asset scan: WIP Series Directory not found: {wip_scan_path}. Will be created if saving an asset.")
-            _dynamic_asset_enum_items = [("NONE", "No assets (WIP folder missing/empty)", f"Path: {wip_scan_path}")]
-        else:
-            assets_found = list_assets(wip_scan_path)
-            if not assets_found:
-                _dynamic_asset_enum_items = [("NONE", "No assets found in WIP", f"No subdirectories in {wip_scan_path}")]
-            else:
-                _dynamic_asset_enum_items = assets_found
-    else:
-        _dynamic_asset_enum_items = [("NONE", "Series Directory not set", "")]
+    _tag_view3d_redraw()
 
-    # Attempt to restore previous selection if it's still valid
-    new_selection_options = [item[0] for item in _dynamic_asset_enum_items]
-    if current_asset_selection in new_selection_options:
-        pass
-    elif new_selection_options and new_selection_options[0] != "NONE":
-        pass # Let Blender handle default selection or keep it blank if "NONE" is the first
-    elif new_selection_options and new_selection_options[0] == "NONE":
-        self.asset_enum = "NONE" # Explicitly set to NONE if it's the only/first option
-    else: # list is completely empty (should not happen due to initialization)
-        self.asset_enum = "NONE"
+def _apply_asset_watch_events():
+    """bpy.app.timers callback: apply folders added, removed or renamed in the watched wip/Assets."""
+    watcher = get_watcher(WATCH_CLIENT, start=False)
+    folder = _asset_scan["watched"]
+    if watcher is None or folder is None:
+        return None
+    events = [event for event in watcher.drain(WATCH_CLIENT) if event[0] == folder]
+    if not events:
+        return 1.0
+
+    props = getattr(bpy.context.scene, "asset_selector_props", None)
+    select = props.asset_enum if props is not None else None
+    for _, kind, name, new_name in events:
+        if kind == 'RESCAN':
+            # Listing lost (folder gone or too many changes at once), fall back to a full scan
+            _asset_scan["watched"] = None
+            if props is not None:
+                start_asset_scan(props)
+            return None
+        if kind == 'RENAME' and name == select:
+            select = new_name
+
+    names = watcher.listing(folder) or []
+    items = [(name, name, "") for name in names]
+    if not items:
+        items = [("NONE", "No assets found in WIP", f"No subdirectories in {folder}")]
+    print(f"Asset list updated from {len(events)} folder change(s) in {folder}")
+    _set_asset_items(items, select)
+    return 1.0
+
+def start_asset_scan(props, select=None):
+    """Scan wip/Assets on a worker thread; the result lands in _dynamic_asset_enum_items via a timer.
+
+    select: asset to pick once the scan finishes. Defaults to the current selection.
+    """
+    global _dynamic_asset_enum_items
 
+    if not props.directory_path:
+        cancel_asset_scan()
+        _dynamic_asset_enum_items = [("NONE", "Series Directory not set", "")]
+        return
+
+    series_root = bpy.path.abspath(props.directory_path)
+    with _asset_scan_lock:
+        _asset_scan["generation"] += 1
+        _asset_scan["result"] = None
+        _asset_scan["select"] = select if select is not None else props.asset_enum
+        _asset_scan["folder"] = os.path.join(series_root, "wip", "Assets")
+        generation = _asset_scan["generation"]
+
+    _dynamic_asset_enum_items = [("NONE", "Scanning...", f"Path: {os.path.join(series_root, 'wip', 'Assets')}")]
+    threading.Thread(target=_scan_assets_worker, args=(generation, series_root), daemon=True).start()
+    if not bpy.app.timers.is_registered(_publish_asset_scan):
+        bpy.app.timers.register(_publish_asset_scan, first_interval=0.1)
+
+def cancel_asset_scan():
+    """Drop any scan in flight and stop polling for it."""
+    with _asset_scan_lock:
+        _asset_scan["generation"] += 1
+        _asset_scan["result"] = None
+    if bpy.app.timers.is_registered(_publish_asset_scan):
+        bpy.app.timers.unregister(_publish_asset_scan)
+
+def update_asset_list_and_dependent_props(self, context):
+    """Called when directory_path changes. Starts a background rescan for asset_enum."""
+    start_asset_scan(self)
     self.update_asset() # Call to update asset_name and asset_full_path
     return None # Required for update functions
 
+def select_after_save(props, assetname):
+    """Asset to select after a save: a newly created asset, or the typed name when nothing is selected."""
+    if assetname not in [item[0] for item in _dynamic_asset_enum_items] or props.asset_enum == "NONE":
+        return assetname
+    return None
+
+
+# --- Background Publish ---
+# A background publish writes one local temp .blend and hands it to a `blender -b`
+# worker, which saves it to the publish folder and the Asset Library (so relative
+# paths are remapped per destination, as a normal save would). A watcher thread then
+# re-reads every destination and checks it against the worker's checksum.
+PUBLISH_TEMP_DIR = os.path.join(tempfile.gettempdir(), "two_pints_publish")
+PUBLISH_TIMEOUT = 1800 # seconds before a hung worker is stopped and its publish marked failed
+
+_PUBLISH_WORKER_SCRIPT = """
+import bpy, hashlib, json, os, sys
+for target in json.loads(sys.argv[sys.argv.index("--") + 1]):
+    dest = target["path"]
+    partial = dest[:-len(".blend")] + ".publishing.blend"
+    bpy.ops.wm.save_as_mainfile(filepath=partial, copy=True,
+                                compress=target["compress"], relative_remap=target["relative_remap"])
+    digest = hashlib.sha256()
+    with open(partial, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    os.replace(partial, dest)
+    print("PUBLISHED " + json.dumps({"path": dest, "sha256": digest.hexdigest()}), flush=True)
+"""
+
+_publish_jobs = []
+# Jobs run one at a time, in order, so an older publish never lands in the Asset Library last
+_publish_queue = queue.Queue()
+_publish_worker = None
+
+class PublishJob:
+    """One background publish of a temp .blend to its destinations (publish version first)."""
+
+    def __init__(self, label, temp_path, destinations, modes, dedup_store=None):
+        self.label = label
+        self.modes = modes
+        self.dedup_store = dedup_store
+        self.temp_path = temp_path
+        self.destinations = destinations
+        self.state = 'RUNNING' # RUNNING, DONE or FAILED
+        self.seconds = 0.0
+        self.message = "Queued"
+        self._blender = bpy.app.binary_path # Resolved on the main thread
+
+    def start(self):
+        global _publish_worker
+        _publish_jobs.append(self)
+        _publish_queue.put(self)
+        if _publish_worker is None:
+            _publish_worker = threading.Thread(target=_run_publish_queue, daemon=True)
+            _publish_worker.start()
+        if not bpy.app.timers.is_registered(_watch_publish_jobs):
+            bpy.app.timers.register(_watch_publish_jobs, first_interval=0.5)
+
+    def run(self):
+        start = time.perf_counter()
+        self.message = "Publishing..."
+        try:
+            cmd = [self._blender, "-b", "--factory-startup", self.temp_path,
+                   "--python-exit-code", "1", "--python-expr", _PUBLISH_WORKER_SCRIPT,
+                   "--", json.dumps([dict(path=dest, compress=save_compressed(mode, bool(self.dedup_store) and i == 0),
+                                          relative_remap=SAVE_POLICIES[mode]["relative_remap"])
+                                     for i, (dest, mode) in enumerate(zip(self.destinations, self.modes))])]
+            try:
+                proc = subprocess.run(cmd, capture_output=True, text=True, timeout=PUBLISH_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                raise RuntimeError(f"Worker timed out after {PUBLISH_TIMEOUT}s")
+            written = {}
+            for line in proc.stdout.splitlines():
+                if line.startswith("PUBLISHED "):
+                    entry = json.loads(line[len("PUBLISHED "):])
+                    written[entry["path"]] = entry["sha256"]
+            missing = [dest for dest in self.destinations if dest not in written]
+            if proc.returncode or missing:
+                stderr_tail = proc.stderr.strip().splitlines()[-1:] or [""]
+                raise RuntimeError(f"Worker exited {proc.returncode}, not written: {', '.join(missing)} {stderr_tail[0]}")
+            for dest, digest in written.items():
+                if file_sha256(dest) != digest:
+                    raise RuntimeError(f"Checksum mismatch after writing {dest}")
+            # The worker's saves made the publish folder's version index stale
+            rebuild_version_index(os.path.dirname(self.destinations[0]))
+            for i, (dest, mode) in enumerate(zip(self.destinations, self.modes)):
+                print(f"Save [{mode}] {dest}: {os.path.getsize(dest) / 1048576:.1f} MB (background)")
+                # The publish version is left as it is when dedup will store it later
+                if SAVE_POLICIES[mode]["recompress"] and not (self.dedup_store and i == 0) and recompress_backend():
+                    recompress_blend(dest, expected_sha256=written[dest]) # Already off the main thread
+            if self.dedup_store:
+                submit_post_save(dedup_older_versions, os.path.dirname(self.destinations[0]),
+                                 os.path.basename(self.destinations[0]), self.dedup_store)
+            os.remove(self.temp_path)
+            self.state = 'DONE'
+            self.message = f"Published {os.path.basename(self.destinations[0])}"
+        except Exception as e:
+            # Temp file is kept so the publish can be inspected or redone by hand
+            self.state = 'FAILED'
+            self.message = f"Failed: {e}"
+        self.seconds = time.perf_counter() - start
+        print(f"Background publish {self.label}: {self.message} ({self.seconds:.1f}s)")
+
+def _run_publish_queue():
+    while True:
+        _publish_queue.get().run()
+
+def pending_publish_paths():
+    """Publish paths reserved by jobs that have not finished writing yet."""
+    return {job.destinations[0] for job in _publish_jobs if job.state == 'RUNNING'}
+
+def _tag_view3d_redraw():
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+def _watch_publish_jobs():
+    """bpy.app.timers callback: keep the status panel current while publishes run."""
+    _tag_view3d_redraw()
+    return 0.5 if pending_publish_paths() else None
 
 # --- Properties ---
 class AssetSelectorProperties(PropertyGroup):
@@ -154,6 +398,24 @@ class AssetSelectorProperties(PropertyGroup):
         description="Selected task name, or type manually"
     )
 
+    use_dedup_storage: BoolProperty(
+        name="Deduplicated Version Storage",
+        default=False,
+        description="Keep only the newest WIP/publish version as a full .blend and store older ones as chunks shared across the show. Older versions can no longer be opened or linked until restored"
+    )
+
+    publish_in_background: BoolProperty(
+        name="Publish in Background",
+        default=False,
+        description="Save one local temp file and let a background Blender write the publish and Asset Library copies"
+    )
+
+    version_search: StringProperty(
+        name="Find Version",
+        default="",
+        description="Search the series catalog for asset versions by name"
+    )
+
     asset_wip_dir_path: StringProperty(
         name="Current Asset WIP Directory",
         default="",
@@ -209,28 +471,30 @@ class AssetSelectorProperties(PropertyGroup):
 
 # --- Save Logic ---
 class SaveFilesLogic:
-    def __init__(self, asset_root_abs, asset_name, task_name):
+    def __init__(self, asset_root_abs, asset_name, task_name, dedup=False):
         self.asset_root_abs = asset_root_abs
         self.asset_name = asset_name
         self.task_name = task_name
+        self.dedup_store = os.path.join(asset_root_abs, DEDUP_STORE_DIRNAME) if dedup else None
 
-    def save_file(self, mode="wip", incremental=True):
-        if not self.asset_name or not self.task_name:
-            raise ValueError("Asset Name and Task Name cannot be empty for saving.")
-
-        ensure_directories(self.asset_root_abs, self.asset_name)
-
+    def target_dir(self, mode):
         if mode == "wip":
             # Modified path
-            target_dir = os.path.join(self.asset_root_abs, "wip", "Assets", self.asset_name)
+            return os.path.join(self.asset_root_abs, "wip", "Assets", self.asset_name)
         elif mode == "publish":
             # Modified path
-            target_dir = os.path.join(self.asset_root_abs, "publish", "Assets", self.asset_name)
+            return os.path.join(self.asset_root_abs, "publish", "Assets", self.asset_name)
         elif mode == "asset_library":
-            target_dir = os.path.join(self.asset_root_abs, "Asset Library")
-        else:
-            raise ValueError("Unknown save mode: " + mode)
+            return os.path.join(self.asset_root_abs, "Asset Library")
+        raise ValueError("Unknown save mode: " + mode)
+
+    def save_file(self, mode="wip", incremental=True):
+        if not self.asset_name or not self.task_name:
+            raise ValueError("Asset Name and Task Name cannot be empty for saving.")
+
+        ensure_directories(self.asset_root_abs, self.asset_name)
 
+        target_dir = self.target_dir(mode)
         # Redundant if ensure_directories was called, but good for safety if target_dir logic changes
         os.makedirs(target_dir, exist_ok=True)
 
@@ -247,13 +511,48 @@ class SaveFilesLogic:
             current_filepath = bpy.data.filepath
             is_untitled = not bpy.data.is_saved
 
-            bpy.ops.wm.save_as_mainfile(filepath=save_path, copy=False)
-            print(f"Saved to: {save_path}")
+            deduplicated = bool(self.dedup_store) and incremental and mode != "asset_library"
+            save_blend(save_path, mode, deduplicated)
+            if incremental and mode != "asset_library":
+                record_saved_version(target_dir, filename)
+                if deduplicated:
+                    submit_post_save(dedup_older_versions, target_dir, filename, self.dedup_store)
+            queue_recompress(save_path, mode, deduplicated)
             return save_path
         except Exception as e:
             print(f"Error saving to {save_path}: {e}")
             raise
 
+    def publish_in_background(self):
+        """Save a local temp copy and start a PublishJob writing the next publish version and the Asset Library file."""
+        if not self.asset_name or not self.task_name:
+            raise ValueError("Asset Name and Task Name cannot be empty for saving.")
+
+        ensure_directories(self.asset_root_abs, self.asset_name)
+        publish_dir = self.target_dir("publish")
+        base_name = f"{self.asset_name}_{self.task_name}"
+
+        # Versions still being written by earlier jobs are not on disk yet, skip past them
+        filename = get_next_increment_filename(publish_dir, base_name)
+        _, number = parse_version_filename(filename)
+        reserved = pending_publish_paths()
+        while os.path.join(publish_dir, filename) in reserved:
+            number += 1
+            filename = f"{base_name}_v{str(number).zfill(3)}.blend"
+
+        destinations = [
+            os.path.join(publish_dir, filename),
+            os.path.join(self.target_dir("asset_library"), f"{base_name}.blend"),
+        ]
+        os.makedirs(PUBLISH_TEMP_DIR, exist_ok=True)
+        temp_path = os.path.join(PUBLISH_TEMP_DIR, f"{base_name}_{time.time_ns()}.blend")
+        bpy.ops.wm.save_as_mainfile(filepath=temp_path, copy=True)
+        print(f"Saved publish temp: {temp_path}")
+
+        job = PublishJob(filename, temp_path, destinations, ["publish", "asset_library"], self.dedup_store)
+        job.start()
+        return job
+
 # --- Save Operators ---
 class IterateSave(Operator):
     bl_idname = "smol.iterate_save"
@@ -284,21 +583,13 @@ class IterateSave(Operator):
                 self.report({'ERROR'}, f"Series Directory Root does not exist and could not be created: {asset_root_abs} - {e}")
                 return {'CANCELLED'}
 
-        logic = SaveFilesLogic(asset_root_abs, assetname, taskname)
+        logic = SaveFilesLogic(asset_root_abs, assetname, taskname, dedup=props.use_dedup_storage)
         try:
             saved_path = logic.save_file(mode="wip", incremental=True)
             self.report({'INFO'}, f"Saved WIP: {saved_path}")
             
-            # If a new asset was created by typing a name, refresh list and select it
-            asset_just_created = False
-            if assetname not in [item[0] for item in _dynamic_asset_enum_items]:
-                asset_just_created = True
-
-            update_asset_list_and_dependent_props(props, context) # Refresh list
-            if asset_just_created and assetname in [item[0] for item in _dynamic_asset_enum_items]:
-                props.asset_enum = assetname # Select the new asset
-            elif props.asset_enum == "NONE" and assetname in [item[0] for item in _dynamic_asset_enum_items]:
-                props.asset_enum = assetname
+            # If a new asset was created by typing a name, refresh list and select it once scanned
+            start_asset_scan(props, select=select_after_save(props, assetname))
 
         except Exception as e:
             self.report({'ERROR'}, f"Error saving WIP: {str(e)}")
@@ -334,11 +625,25 @@ class PublishFiles(Operator):
                 self.report({'ERROR'}, f"Series Directory Root does not exist and could not be created: {asset_root_abs} - {e}")
                 return {'CANCELLED'}
 
-        logic = SaveFilesLogic(asset_root_abs, assetname, taskname)
+        logic = SaveFilesLogic(asset_root_abs, assetname, taskname, dedup=props.use_dedup_storage)
+        if props.publish_in_background:
+            try:
+                job = logic.publish_in_background()
+            except Exception as e:
+                self.report({'ERROR'}, f"Error starting background publish: {str(e)}")
+                return {'CANCELLED'}
+            self.report({'INFO'}, f"Publishing in background: {job.destinations[0]}")
+            if recompress_fallback("publish"):
+                self.report({'WARNING'}, RECOMPRESS_FALLBACK_MESSAGE)
+            start_asset_scan(props, select=select_after_save(props, assetname))
+            return {'FINISHED'}
+
         try:
             # Save incremental version to publish folder
             saved_path = logic.save_file(mode="publish", incremental=True)
             self.report({'INFO'}, f"Published: {saved_path}")
+            if recompress_fallback("publish"):
+                self.report({'WARNING'}, RECOMPRESS_FALLBACK_MESSAGE)
 
             # Save single non-incremental version to Asset Library (overwrite existing)
             try:
@@ -347,15 +652,7 @@ class PublishFiles(Operator):
             except Exception as e:
                 self.report({'WARNING'}, f"Publish succeeded but saving to Asset Library failed: {str(e)}")
 
-            asset_just_created = False
-            if assetname not in [item[0] for item in _dynamic_asset_enum_items]:
-                asset_just_created = True
-
-            update_asset_list_and_dependent_props(props, context)
-            if asset_just_created and assetname in [item[0] for item in _dynamic_asset_enum_items]:
-                props.asset_enum = assetname
-            elif props.asset_enum == "NONE" and assetname in [item[0] for item in _dynamic_asset_enum_items]:
-                props.asset_enum = assetname
+            start_asset_scan(props, select=select_after_save(props, assetname))
 
         except Exception as e:
             self.report({'ERROR'}, f"Error publishing file: {str(e)}")
@@ -391,17 +688,17 @@ class LoadLatestWIP(Operator):
             return {'CANCELLED'}
 
         base_name = f"{assetname}_{taskname}"
-        latest_file = get_latest_version(wip_dir, base_name)
+        latest_file = get_latest_version(wip_dir, base_name, get_catalog(asset_root_abs))
 
         if latest_file:
             try:
+                materialize_version(latest_file, os.path.join(asset_root_abs, DEDUP_STORE_DIRNAME))
                 bpy.ops.wm.open_mainfile(filepath=latest_file)
                 self.report({'INFO'}, f"Loaded latest WIP: {latest_file}")
 
                 new_props = bpy.context.scene.asset_selector_props
-                new_props.asset_enum = assetname # Try to set enum on new scene props
                 new_props.task_enum = taskname
-                update_asset_list_and_dependent_props(new_props, context) # Refresh list for new context
+                start_asset_scan(new_props, select=assetname) # Refresh list for new context
 
                 return {'FINISHED'}
             except Exception as e:
@@ -439,17 +736,17 @@ class LoadLatestPublish(Operator):
             return {'CANCELLED'}
             
         base_name = f"{assetname}_{taskname}"
-        latest_file = get_latest_version(publish_dir, base_name)
+        latest_file = get_latest_version(publish_dir, base_name, get_catalog(asset_root_abs))
 
         if latest_file:
             try:
+                materialize_version(latest_file, os.path.join(asset_root_abs, DEDUP_STORE_DIRNAME))
                 bpy.ops.wm.open_mainfile(filepath=latest_file)
                 self.report({'INFO'}, f"Loaded latest Publish: {latest_file}")
 
                 new_props = bpy.context.scene.asset_selector_props
-                new_props.asset_enum = assetname
                 new_props.task_enum = taskname
-                update_asset_list_and_dependent_props(new_props, context)
+                start_asset_scan(new_props, select=assetname)
 
                 return {'FINISHED'}
             except Exception as e:
@@ -459,6 +756,23 @@ class LoadLatestPublish(Operator):
             self.report({'INFO'}, f"No published files found for '{base_name}' in {publish_dir}")
             return {'CANCELLED'}
 
+class OpenCatalogVersion(Operator):
+    bl_idname = "smol.open_version"
+    bl_label = "Open Version"
+    bl_description = "Open this version from the series catalog"
+
+    filepath: StringProperty()
+
+    def execute(self, context):
+        if not os.path.isfile(self.filepath):
+            self.report({'ERROR'}, f"Not found (catalog out of date?): {self.filepath}")
+            return {'CANCELLED'}
+        asset_root_abs = bpy.path.abspath(context.scene.asset_selector_props.directory_path)
+        materialize_version(self.filepath, os.path.join(asset_root_abs, DEDUP_STORE_DIRNAME))
+        bpy.ops.wm.open_mainfile(filepath=self.filepath)
+        self.report({'INFO'}, f"Loaded: {self.filepath}")
+        return {'FINISHED'}
+
 # --- Panels ---
 class AssetSelectorPanel(Panel):
     bl_label = "Asset Manager" # Panel Label
@@ -496,6 +810,291 @@ class AssetSelectorPanel(Panel):
         col = layout.column(align=True)
         col.operator(LoadLatestPublish.bl_idname, text="Asset Load Publish", icon='FILE_FOLDER')
         col.operator(PublishFiles.bl_idname, text="Asset Publish", icon='ASSET_MANAGER')
+        col.prop(props, "publish_in_background")
+        col.prop(props, "use_dedup_storage")
+        layout.separator()
+
+        layout.prop(props, "version_search", text="", icon='VIEWZOOM')
+        if props.version_search and props.directory_path:
+            col = layout.column(align=True)
+            rows = search_catalog(bpy.path.abspath(props.directory_path), props.version_search, ASSET_CATALOG_ROOTS)
+            for path, version, size in rows:
+                op = col.operator(OpenCatalogVersion.bl_idname, text=f"{os.path.basename(path)}  ({size / 1048576:.1f} MB)", icon='FILE_BLEND')
+                op.filepath = path
+            if not rows:
+                col.label(text="No matches in the series catalog")
+
+class ClearFinishedPublishes(Operator):
+    bl_idname = "smol.clear_finished_publishes"
+    bl_label = "Clear Finished"
+    bl_description = "Remove finished and failed background publishes from the list"
+
+    def execute(self, context):
+        _publish_jobs[:] = [job for job in _publish_jobs if job.state == 'RUNNING']
+        return {'FINISHED'}
+
+class AssetPublishStatusPanel(Panel):
+    bl_label = "Background Publishes"
+    bl_idname = "VIEW3D_PT_asset_publish_status"
+    bl_parent_id = "VIEW3D_PT_asset_manager"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = 'Two Pints'
+
+    @classmethod
+    def poll(cls, context):
+        return bool(_publish_jobs)
+
+    def draw(self, context):
+        layout = self.layout
+        icons = {'RUNNING': 'TIME', 'DONE': 'CHECKMARK', 'FAILED': 'ERROR'}
+        col = layout.column(align=True)
+        for job in reversed(_publish_jobs):
+            text = job.message if job.state == 'RUNNING' else f"{job.message} ({job.seconds:.1f}s)"
+            col.label(text=text, icon=icons[job.state])
+        layout.operator(ClearFinishedPublishes.bl_idname, icon='X')
+
+# --- Batch Publish (command line) ---
+# Publishes the latest WIP of many assets without the UI:
+#   blender -b --factory-startup -P Pipeline-AssetPublishTool.py -- batch-publish --root X:/KWI
+#       [--assets Chair Table] [--tasks Rig Model] [--workers 4] [--dedup]
+#       [--progress progress.jsonl] [--report report.csv] [--timeout 3600]
+# The coordinator hands one asset at a time to N long-lived `blender -b` workers over
+# stdin/stdout. All tasks of an asset go to the same worker, so two processes never write
+# the same publish folder's version index at once. Every finished asset is appended to the
+# progress file; running the same command again skips assets already marked done.
+# A worker that doesn't answer within --timeout is killed, its asset marked failed, and
+# the next asset starts a fresh worker.
+BATCH_PROGRESS_FILENAME = "batch_publish_progress.jsonl"
+BATCH_RESULT_PREFIX = "BATCH_RESULT "
+BATCH_ASSET_TIMEOUT = 3600 # seconds a worker may take for all tasks of one asset
+
+def publish_asset_tasks(asset_root_abs, asset_name, task_names, dedup=False):
+    """Open the latest WIP of each task and publish it. Returns a result dict with per-step timings."""
+    started = time.perf_counter()
+    wip_dir = os.path.join(asset_root_abs, "wip", "Assets", asset_name)
+    result = {"asset": asset_name, "status": "skipped", "tasks": {}}
+
+    for task_name in task_names:
+        latest_file = get_latest_version(wip_dir, f"{asset_name}_{task_name}")
+        if not latest_file:
+            result["tasks"][task_name] = {"status": "skipped", "error": "No WIP version found"}
+            continue
+        task_started = time.perf_counter()
+        try:
+            materialize_version(latest_file, os.path.join(asset_root_abs, DEDUP_STORE_DIRNAME))
+            bpy.ops.wm.open_mainfile(filepath=latest_file)
+            opened = time.perf_counter()
+
+            logic = SaveFilesLogic(asset_root_abs, asset_name, task_name, dedup=dedup)
+            publish_path = logic.save_file(mode="publish", incremental=True)
+            library_path = logic.save_file(mode="asset_library", incremental=False)
+            result["tasks"][task_name] = {
+                "status": "done",
+                "wip": latest_file,
+                "publish": publish_path,
+                "asset_library": library_path,
+                "open_seconds": round(opened - task_started, 3),
+                "publish_seconds": round(time.perf_counter() - opened, 3),
+            }
+            if result["status"] == "skipped":
+                result["status"] = "done"
+        except Exception as e:
+            print(f"Batch publish failed for {asset_name} {task_name}: {e}")
+            result["tasks"][task_name] = {"status": "failed", "error": str(e)}
+            result["status"] = "failed"
+
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+def load_batch_progress(progress_path):
+    """Return {asset: last result} from a progress file; a missing or partly written file is fine."""
+    finished = {}
+    if not os.path.exists(progress_path):
+        return finished
+    with open(progress_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue # Truncated last line from an interrupted run
+            finished[entry["asset"]] = entry
+    return finished
+
+def _start_batch_worker(asset_root_abs, dedup):
+    cmd = [bpy.app.binary_path, "-b", "--factory-startup", "--python-exit-code", "1",
+           "-P", os.path.abspath(__file__), "--", "batch-worker", "--root", asset_root_abs]
+    if dedup:
+        cmd.append("--dedup")
+    # stderr is left attached to the console so worker errors stay visible
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1)
+    # stdout is read on its own thread, so the coordinator can wait for a line with a deadline
+    output = queue.Queue()
+    threading.Thread(target=_read_batch_worker, args=(proc, output), daemon=True).start()
+    return proc, output
+
+def _read_batch_worker(proc, output):
+    for line in proc.stdout:
+        output.put(line)
+    output.put(None) # Worker exited
+
+def _stop_batch_worker(proc, kill=False):
+    if kill:
+        proc.kill()
+    try:
+        proc.stdin.close()
+    except OSError:
+        pass
+    proc.wait()
+
+def run_batch_worker(args):
+    """Worker side: read one JSON job per line from stdin, print one result line per job."""
+    asset_root_abs = os.path.abspath(args.root)
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        job = json.loads(line)
+        result = publish_asset_tasks(asset_root_abs, job["asset"], job["tasks"], args.dedup)
+        print(BATCH_RESULT_PREFIX + json.dumps(result), flush=True)
+    shutdown_post_save_pool(wait=True) # Let recompression/dedup finish before the process exits
+    return 0
+
+def run_batch_publish(args):
+    """Coordinator side: queue the assets, drive the workers, keep the progress file and print the report."""
+    asset_root_abs = os.path.abspath(args.root)
+    assets = args.assets or sorted(a[0] for a in list_assets(os.path.join(asset_root_abs, "wip", "Assets")))
+    tasks = args.tasks or [t[0] for t in TASK_LIST]
+    progress_path = args.progress or os.path.join(asset_root_abs, BATCH_PROGRESS_FILENAME)
+
+    previous = load_batch_progress(progress_path)
+    jobs = queue.Queue()
+    for asset_name in assets:
+        if previous.get(asset_name, {}).get("status") != "done":
+            jobs.put(asset_name)
+    total = jobs.qsize()
+    print(f"Batch publish: {total} of {len(assets)} assets to publish ({len(assets) - total} already done), "
+          f"tasks {', '.join(tasks)}, {args.workers} workers")
+
+    results = []
+    results_lock = threading.Lock()
+    started = time.perf_counter()
+
+    def drive_worker():
+        proc = None
+        while True:
+            try:
+                asset_name = jobs.get_nowait()
+            except queue.Empty:
+                break
+            if proc is None:
+                proc, output = _start_batch_worker(asset_root_abs, args.dedup)
+
+            result = None
+            timed_out = False
+            asset_started = time.perf_counter()
+            try:
+                proc.stdin.write(json.dumps({"asset": asset_name, "tasks": tasks}) + "\n")
+                proc.stdin.flush()
+                deadline = time.monotonic() + args.timeout
+                while True:
+                    out_line = output.get(timeout=max(0.0, deadline - time.monotonic()))
+                    if out_line is None:
+                        break # Worker exited
+                    if out_line.startswith(BATCH_RESULT_PREFIX):
+                        result = json.loads(out_line[len(BATCH_RESULT_PREFIX):])
+                        break
+            except queue.Empty:
+                timed_out = True
+            except OSError:
+                pass # Broken pipe, handled as a crashed worker below
+            if result is None:
+                # Worker crashed or hung on this asset; record it and carry on with a fresh process
+                _stop_batch_worker(proc, kill=timed_out)
+                error = (f"Worker timed out after {args.timeout:g}s" if timed_out
+                         else f"Worker exited with code {proc.returncode}")
+                result = {"asset": asset_name, "status": "failed", "tasks": {},
+                          "seconds": round(time.perf_counter() - asset_started, 3), "error": error}
+                proc = None
+
+            with results_lock:
+                results.append(result)
+                with open(progress_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(result) + "\n")
+                print(f"[{len(results)}/{total}] {asset_name}: {result['status']} ({result['seconds']:.1f}s)")
+        if proc is not None:
+            _stop_batch_worker(proc)
+
+    threads = [threading.Thread(target=drive_worker, daemon=True) for _ in range(max(1, min(args.workers, total)))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print_batch_report(results, time.perf_counter() - started)
+    if args.report:
+        write_batch_report(results, args.report)
+    return 1 if any(r["status"] == "failed" for r in results) else 0
+
+def _batch_report_rows(results):
+    for result in sorted(results, key=lambda r: r["seconds"], reverse=True):
+        task_results = result["tasks"].values()
+        yield {
+            "asset": result["asset"],
+            "status": result["status"],
+            "published": sum(1 for t in task_results if t["status"] == "done"),
+            "open_seconds": round(sum(t.get("open_seconds", 0.0) for t in task_results), 3),
+            "publish_seconds": round(sum(t.get("publish_seconds", 0.0) for t in task_results), 3),
+            "total_seconds": result["seconds"],
+            "error": result.get("error") or "; ".join(
+                f"{name}: {t['error']}" for name, t in result["tasks"].items() if t["status"] == "failed"),
+        }
+
+def print_batch_report(results, seconds):
+    print(f"{'Asset':<32} {'Status':<8} {'Tasks':>5} {'Open':>8} {'Publish':>8} {'Total':>8}")
+    for row in _batch_report_rows(results):
+        print(f"{row['asset']:<32} {row['status']:<8} {row['published']:>5} {row['open_seconds']:>8.1f} "
+              f"{row['publish_seconds']:>8.1f} {row['total_seconds']:>8.1f}  {row['error']}")
+    failed = sum(1 for r in results if r["status"] == "failed")
+    print(f"Batch publish finished: {len(results)} assets, {failed} failed, {seconds:.1f}s wall time")
+
+def write_batch_report(results, report_path):
+    fields = ["asset", "status", "published", "open_seconds", "publish_seconds", "total_seconds", "error"]
+    with open(report_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(_batch_report_rows(results))
+    print(f"Wrote batch report: {report_path}")
+
+def batch_main(argv):
+    parser = argparse.ArgumentParser(prog="Pipeline-AssetPublishTool.py", description="Batch publish assets headless.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    publish = commands.add_parser("batch-publish", help="Publish the latest WIP of many assets")
+    publish.add_argument("--root", required=True, help="Series root containing wip/ and publish/")
+    publish.add_argument("--assets", nargs="*", help="Asset names (default: every folder in wip/Assets)")
+    publish.add_argument("--tasks", nargs="*", choices=[t[0] for t in TASK_LIST], help="Tasks (default: all)")
+    publish.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    publish.add_argument("--dedup", action="store_true", help="Store older publish versions as chunk manifests (they need restoring before they can be opened or linked)")
+    publish.add_argument("--progress", help=f"Progress file (default: <root>/{BATCH_PROGRESS_FILENAME})")
+    publish.add_argument("--report", help="Write the per-asset timing report to this CSV file")
+    publish.add_argument("--timeout", type=float, default=BATCH_ASSET_TIMEOUT, help="Seconds a worker may take for one asset before it is stopped and the asset failed")
+
+    worker = commands.add_parser("batch-worker", help="Internal: worker process started by batch-publish")
+    worker.add_argument("--root", required=True)
+    worker.add_argument("--dedup", action="store_true")
+
+    restore = commands.add_parser("restore-versions", help="Rebuild deduplicated versions back into plain .blend files")
+    restore.add_argument("folders", nargs="+", help="Version folders to restore")
+    restore.add_argument("--store", required=True, help=f"Chunk store (<series root>/{DEDUP_STORE_DIRNAME})")
+
+    args = parser.parse_args(argv)
+    if args.command == "batch-worker":
+        return run_batch_worker(args)
+    if args.command == "restore-versions":
+        restored = [path for folder in args.folders for path in restore_deduplicated_versions(folder, args.store)]
+        print(f"Restored {len(restored)} version(s)")
+        return 0
+    return run_batch_publish(args)
 
 # --- Registration ---
 _classes = [
@@ -504,7 +1103,10 @@ _classes = [
     PublishFiles,
     LoadLatestWIP,
     LoadLatestPublish,
-    AssetSelectorPanel
+    OpenCatalogVersion,
+    ClearFinishedPublishes,
+    AssetSelectorPanel,
+    AssetPublishStatusPanel
 ]
 
 def register():
@@ -519,7 +1121,14 @@ def register():
 
 def unregister():
     global _dynamic_asset_enum_items
-    
+
+    cancel_asset_scan()
+    if bpy.app.timers.is_registered(_apply_asset_watch_events):
+        bpy.app.timers.unregister(_apply_asset_watch_events)
+    _asset_scan["watched"] = None
+    stop_watcher(WATCH_CLIENT)
+    shutdown_post_save_pool()
+    close_catalogs()
     for cls in reversed(_classes):
         bpy.utils.unregister_class(cls)
 
@@ -527,6 +1136,10 @@ def unregister():
     _dynamic_asset_enum_items = []
 
 if __name__ == "__main__":
+    # Command line batch mode: blender -b -P Pipeline-AssetPublishTool.py -- batch-publish ...
+    if bpy.app.background and "--" in sys.argv:
+        sys.exit(batch_main(sys.argv[sys.argv.index("--") + 1:]))
+
     # Clean unregister attempt for testing
     try:
         # Check if a panel with this bl_idname exists (indicative of previous registration)
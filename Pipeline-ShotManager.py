@@ -10,49 +10,179 @@ bl_info = {
 
 import bpy
 import os
+import sys
+import csv
+import json
+import argparse
+import queue
+import sqlite3
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from bpy.types import Panel, Operator, PropertyGroup
-from bpy.props import StringProperty, EnumProperty, PointerProperty
+from bpy.props import StringProperty, EnumProperty, PointerProperty, BoolProperty, IntProperty
+
+# Shared modules (pipeline_storage.py) live next to the add-ons
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+from pipeline_storage import (
+    get_watcher, stop_watcher, is_listed_folder, list_subfolders,
+    parse_version_filename, load_version_index, rebuild_version_index, record_saved_version,
+    DEDUP_STORE_DIRNAME, materialize_version, dedup_older_versions,
+    SAVE_POLICIES, save_blend, submit_post_save, queue_recompress, recompress_blend,
+    RECOMPRESS_FALLBACK_MESSAGE, recompress_backend, recompress_fallback, save_compressed,
+    shutdown_post_save_pool, SeriesCatalog,
+    get_catalog, search_catalog, clear_catalog_search, close_catalogs, get_latest_version,
+)
+
+WATCH_CLIENT = __name__ # this add-on's name towards the shared directory watcher
+
+# Settings
+DIR_CACHE_TTL = 30.0          # seconds a cached directory listing is trusted before re-reading it
+DIR_CACHE_MAX_ENTRIES = 256   # least recently used listings are dropped past this
+BATCH_SHOT_TIMEOUT = 1800 # seconds before a batch shot's Blender is stopped and the shot reported as failed
+
+# Directory listing cache
+# The enum item callbacks run on every panel redraw, so listings of the share are
+# cached per absolute path. The cache also keeps the returned item lists alive,
+# which Blender requires of dynamic enum callbacks. Listed folders are handed to the
+# directory watcher; its add/remove/rename events are applied to the cached items,
+# so watched listings never expire. DIR_CACHE_TTL only applies when watching fails.
+_dir_cache = OrderedDict()  # abs path -> (time listed, enum items, watched)
+
+def invalidate_dir_cache(path=None):
+    keys = list(_dir_cache) if path is None else [os.path.abspath(path)]
+    for key in keys:
+        entry = _dir_cache.pop(key, None)
+        watcher = get_watcher(WATCH_CLIENT, start=False)
+        if entry and entry[2] and watcher is not None:
+            watcher.unwatch(key, WATCH_CLIENT)
+
+def apply_watch_events():
+    """Apply queued watcher events to the cached listings. Returns True if any listing changed."""
+    watcher = get_watcher(WATCH_CLIENT, start=False)
+    if watcher is None:
+        return False
+    changed = False
+    for folder, kind, name, new_name in watcher.drain(WATCH_CLIENT):
+        entry = _dir_cache.get(folder)
+        if entry is None:
+            continue
+        if kind == 'RESCAN':
+            # listing lost, next redraw lists the folder again
+            _dir_cache.pop(folder)
+            changed = True
+            continue
+        names = [item[0] for item in entry[1] if item[0] != "NONE"]
+        if kind == 'ADD':
+            names.append(name)
+        elif kind == 'REMOVE':
+            names = [n for n in names if n != name]
+        elif kind == 'RENAME':
+            names = [new_name if n == name else n for n in names]
+        items = [(n, n, "") for n in names] or [("NONE", "None Found", "")]
+        _dir_cache[folder] = (entry[0], items, entry[2])
+        changed = True
+    return changed
+
+def _watch_timer():
+    """bpy.app.timers callback: keep the pickers current while nothing is redrawing them."""
+    if apply_watch_events():
+        for window in bpy.context.window_manager.windows:
+            for area in window.screen.areas:
+                if area.type == 'VIEW_3D':
+                    area.tag_redraw()
+    return 1.0
+
+# Series catalog sync
+# The panel reads the catalog through get_catalog (read-only). Every write (syncing a
+# listed folder, the Refresh button) runs on the catalog sync thread with its own connection.
+_catalog_sync_queue = queue.Queue()
+_catalog_sync_thread = None
+
+def queue_catalog_sync(series_root, path=None):
+    """Bring the catalog up to date in the background: one folder, or the shot trees if path is None."""
+    global _catalog_sync_thread
+    _catalog_sync_queue.put((series_root, path))
+    if _catalog_sync_thread is None:
+        _catalog_sync_thread = threading.Thread(target=_run_catalog_sync, name="catalog_sync", daemon=True)
+        _catalog_sync_thread.start()
+
+def _run_catalog_sync():
+    # must not touch bpy
+    while True:
+        series_root, path = _catalog_sync_queue.get()
+        try:
+            with SeriesCatalog(series_root) as catalog:
+                if path is None:
+                    visited, rescanned, seconds = catalog.refresh(("wip/Shots", "publish"))
+                    print(f"Series catalog refreshed: {rescanned}/{visited} folders re-listed in {seconds:.2f}s")
+                elif catalog.relpath(path) is not None:
+                    catalog.sync_dir(catalog.relpath(path))
+        except (OSError, sqlite3.Error) as e:
+            print(f"Series catalog sync failed for {series_root}: {e}")
 
 # Helper functions
-def list_dir_enum(path):
-    if os.path.isdir(path):
-        return [(d, d, "") for d in os.listdir(path) if os.path.isdir(os.path.join(path, d))]
-    return [("NONE", "None Found", "")]
+def list_dir_enum(path, series_root=None):
+    key = os.path.abspath(path)
+    now = time.monotonic()
+    apply_watch_events()
+    cached = _dir_cache.get(key)
+    if cached and (cached[2] or now - cached[0] < DIR_CACHE_TTL):
+        _dir_cache.move_to_end(key)
+        return cached[1]
+
+    names = None
+    has_root = bool(series_root) and os.path.isdir(series_root)
+    catalog = get_catalog(series_root) if has_root else None
+    rel = catalog.relpath(key) if catalog else None
+    if rel is not None:
+        # read only: one stat and a query when the folder is unchanged since it was last catalogued
+        try:
+            if catalog.is_current(rel):
+                names = [n for n in catalog.children(rel) if is_listed_folder(n)]
+        except sqlite3.Error as e:
+            print(f"Series catalog lookup failed for {key}: {e}")
+    if names is None:
+        try:
+            # scandir's is_dir() uses the d_type from the listing, no extra stat per entry
+            names = sorted(list_subfolders(key))
+        except OSError:
+            names = None
+        if has_root and names is not None:
+            queue_catalog_sync(series_root, key)
+    items = [(n, n, "") for n in names] if names is not None else [("NONE", "None Found", "")]
+
+    watcher = get_watcher(WATCH_CLIENT, start=names is not None)
+    watched = watcher is not None and names is not None
+    if watched:
+        watcher.watch(key, names, WATCH_CLIENT)
+    _dir_cache[key] = (now, items, watched)
+    _dir_cache.move_to_end(key)
+    while len(_dir_cache) > DIR_CACHE_MAX_ENTRIES:
+        old_key, old_entry = _dir_cache.popitem(last=False)
+        # the listing above may have failed, the evicted folder is still watched
+        if old_entry[2] and watcher is not None:
+            watcher.unwatch(old_key, WATCH_CLIENT)
+    return items
 
 def get_next_increment_filename(folder, base_name):
     if not os.path.isdir(folder):
         os.makedirs(folder, exist_ok=True)
         return f"{base_name}_v001.blend"
 
-    existing = [f for f in os.listdir(folder) if f.startswith(base_name) and f.endswith(".blend")]
-    numbers = []
-
-    for f in existing:
-        name_without_ext = f[:-6] if f.endswith(".blend") else f
-        if "_v" in name_without_ext:
-            parts = name_without_ext.rsplit("_v", 1)
-            if len(parts) == 2 and parts[1].isdigit():
-                numbers.append(int(parts[1]))
-
-    next_number = max(numbers, default=0) + 1
-    return f"{base_name}_v{str(next_number).zfill(3)}.blend"
-
-def get_latest_version(directory, base_name):
-    if not os.path.isdir(directory):
-        return None
-    latest_file = None
-    latest_num = -1
-    for f in os.listdir(directory):
-        if f.startswith(base_name) and f.endswith(".blend"):
-            name_without_ext = f[:-6] if f.endswith(".blend") else f
-            if "_v" in name_without_ext:
-                parts = name_without_ext.rsplit("_v", 1)
-                if len(parts) == 2 and parts[1].isdigit():
-                    v = int(parts[1])
-                    if v > latest_num:
-                        latest_num = v
-                        latest_file = f
-    return os.path.join(directory, latest_file) if latest_file else None
+    versions = load_version_index(folder)
+    next_number = versions.get(base_name, [0])[0] + 1
+    filename = f"{base_name}_v{str(next_number).zfill(3)}.blend"
+    if os.path.exists(os.path.join(folder, filename)):
+        # index missed a save (same-tick write on a coarse-mtime share), rescan once
+        versions = rebuild_version_index(folder)
+        next_number = versions.get(base_name, [0])[0] + 1
+        filename = f"{base_name}_v{str(next_number).zfill(3)}.blend"
+    return filename
 
 # Property Group
 class ShotSelectorProperties(PropertyGroup):
@@ -66,7 +196,7 @@ class ShotSelectorProperties(PropertyGroup):
     episode_enum: EnumProperty(
         name="Episode",
         description="Auto-discovered Episodes",
-        items=lambda self, context: list_dir_enum(os.path.join(bpy.path.abspath(self.series_directory), "wip", "Shots")), # Changed
+        items=lambda self, context: list_dir_enum(os.path.join(bpy.path.abspath(self.series_directory), "wip", "Shots"), bpy.path.abspath(self.series_directory)), # Changed
         update=lambda self, context: self.sync_episode_name()
     )
     episode_name: StringProperty(name="Episode Name", default="")
@@ -74,7 +204,7 @@ class ShotSelectorProperties(PropertyGroup):
     sequence_enum: EnumProperty(
         name="Sequence",
         description="Auto-discovered Sequences",
-        items=lambda self, context: list_dir_enum(os.path.join(bpy.path.abspath(self.series_directory), "wip", "Shots", self.episode_name or self.episode_enum)), # Changed
+        items=lambda self, context: list_dir_enum(os.path.join(bpy.path.abspath(self.series_directory), "wip", "Shots", self.episode_name or self.episode_enum), bpy.path.abspath(self.series_directory)), # Changed
         update=lambda self, context: self.sync_sequence_name()
     )
     sequence_name: StringProperty(name="Sequence Name", default="")
@@ -82,11 +212,40 @@ class ShotSelectorProperties(PropertyGroup):
     shot_enum: EnumProperty(
         name="Shot",
         description="Auto-discovered Shots",
-        items=lambda self, context: list_dir_enum(os.path.join(bpy.path.abspath(self.series_directory), "wip", "Shots", self.episode_name or self.episode_enum, self.sequence_name or self.sequence_enum)), # Changed
+        items=lambda self, context: list_dir_enum(os.path.join(bpy.path.abspath(self.series_directory), "wip", "Shots", self.episode_name or self.episode_enum, self.sequence_name or self.sequence_enum), bpy.path.abspath(self.series_directory)), # Changed
         update=lambda self, context: self.sync_shot_name()
     )
     shot_name: StringProperty(name="Shot Name", default="")
 
+    use_dedup_storage: BoolProperty(
+        name="Deduplicated Version Storage",
+        default=False,
+        description="Keep only the newest WIP/publish version as a full .blend and store older ones as chunks shared across the show. Older versions can no longer be opened or linked until restored"
+    )
+
+    batch_scope: EnumProperty(
+        name="Batch Scope",
+        items=[("SEQUENCE", "Sequence", "Every shot in the selected sequence"),
+               ("EPISODE", "Episode", "Every shot in every sequence of the selected episode")],
+        default="SEQUENCE"
+    )
+    version_search: StringProperty(
+        name="Find Versions",
+        default="",
+        description="Search the catalogued asset and shot versions of the series by name (Refresh updates the catalog)"
+    )
+    batch_workers: IntProperty(
+        name="Workers",
+        default=max(1, (os.cpu_count() or 2) // 2),
+        min=1,
+        max=32,
+        description="Background Blender processes running at the same time"
+    )
+
+    def update_episode_enum(self):
+        # new series root, drop every cached listing
+        invalidate_dir_cache()
+
     def sync_episode_name(self):
         self.episode_name = self.episode_enum
 
@@ -98,25 +257,12 @@ class ShotSelectorProperties(PropertyGroup):
 
     def get_shot_path(self, subfolder):
         # The 'subfolder' argument will be "wip" or "publish".
-        # We need to insert "Shots" only for the "wip" path.
-        if subfolder == "wip":
-            return os.path.join(
-                bpy.path.abspath(self.series_directory),
-                subfolder,
-                "Shots", # Added "Shots"
-                self.episode_name,
-                self.sequence_name,
-                self.shot_name
-            )
-        else: # For "publish" or any other subfolder, keep the original structure
-            return os.path.join(
-                bpy.path.abspath(self.series_directory),
-                subfolder,
-                self.episode_name,
-                self.sequence_name,
-                self.shot_name
-            )
+        return shot_folder(bpy.path.abspath(self.series_directory), subfolder,
+                           self.episode_name, self.sequence_name, self.shot_name)
+
 
+def get_dedup_store(props):
+    return os.path.join(bpy.path.abspath(props.series_directory), DEDUP_STORE_DIRNAME)
 
 # Save Logic
 class SaveShotFile:
@@ -129,10 +275,201 @@ class SaveShotFile:
         base = f"{self.props.episode_name}_{self.props.sequence_name}_{self.props.shot_name}"
         filename = get_next_increment_filename(path, base) if incremental else f"{base}.blend"
         save_path = os.path.join(path, filename)
-        bpy.ops.wm.save_as_mainfile(filepath=save_path, copy=False)
-        print(f"Saved to {save_path}")
+        save_blend(save_path, mode, incremental and self.props.use_dedup_storage)
+        if incremental:
+            record_saved_version(path, filename)
+            if self.props.use_dedup_storage:
+                submit_post_save(dedup_older_versions, path, filename, get_dedup_store(self.props))
+        queue_recompress(save_path, mode, incremental and self.props.use_dedup_storage)
         return save_path
 
+# Batch shot operations
+# Publishes the latest WIP of every shot in an episode or sequence, or reports the
+# latest WIP/publish version of each. Every publish runs in its own `blender -b`
+# opened on the WIP file, at most `workers` at a time. Each shot has its own publish
+# folder, so parallel publishes never write the same version index.
+# Also runs without the UI, e.g. for nightly publishes:
+#   blender -b --factory-startup -P Pipeline-ShotManager.py -- --root Z:/ --episode EP01
+#       [--sequence SQ010] [--report-only] [--workers 4] [--dedup] [--csv report.csv]
+BATCH_REPORT_TEXT = "Shot Batch Report"
+
+_BATCH_PUBLISH_SCRIPT = """
+import bpy, json, os, sys
+target = json.loads(sys.argv[sys.argv.index("--") + 1])
+partial = target["path"][:-len(".blend")] + ".publishing.blend"
+bpy.ops.wm.save_as_mainfile(filepath=partial, copy=True,
+                            compress=target["compress"], relative_remap=target["relative_remap"])
+os.replace(partial, target["path"])
+print("PUBLISHED " + target["path"], flush=True)
+"""
+
+def shot_folder(series_root, subfolder, episode, sequence, shot):
+    # wip has the extra "Shots" level, publish doesn't
+    if subfolder == "wip":
+        return os.path.join(series_root, subfolder, "Shots", episode, sequence, shot)
+    return os.path.join(series_root, subfolder, episode, sequence, shot)
+
+def list_batch_shots(series_root, episode, sequence=None):
+    """(episode, sequence, shot) for every shot folder under wip/Shots/episode[/sequence]."""
+    def subfolders(path):
+        try:
+            with os.scandir(path) as entries:
+                return sorted(e.name for e in entries if e.is_dir() and is_listed_folder(e.name))
+        except OSError:
+            return []
+
+    episode_dir = os.path.join(series_root, "wip", "Shots", episode)
+    sequences = [sequence] if sequence else subfolders(episode_dir)
+    return [(episode, seq, shot) for seq in sequences for shot in subfolders(os.path.join(episode_dir, seq))]
+
+class ShotBatch:
+    """Publish or report a list of shots on a background thread."""
+
+    def __init__(self, series_root, shots, action, workers=2, dedup=False, timeout=BATCH_SHOT_TIMEOUT):
+        self.series_root = series_root
+        self.action = action # 'PUBLISH' or 'REPORT'
+        self.workers = max(1, workers)
+        self.timeout = timeout # per shot Blender process, None for no limit
+        self.dedup_store = os.path.join(series_root, DEDUP_STORE_DIRNAME) if dedup else None
+        # one result per shot, updated in place: state is QUEUED, RUNNING, DONE, SKIPPED or FAILED
+        self.results = [dict(shot="_".join(s), key=s, state='QUEUED', message="", wip=None, publish=None, seconds=0.0)
+                        for s in shots]
+        self.cancelled = False
+        self.finished = False
+        self.seconds = 0.0
+        self._blender = bpy.app.binary_path # resolved on the main thread
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        # shots already handed to a Blender process still finish
+        self.cancelled = True
+
+    def counts(self):
+        counts = {}
+        for result in self.results:
+            counts[result["state"]] = counts.get(result["state"], 0) + 1
+        return counts
+
+    def run(self):
+        start = time.perf_counter()
+        step = self._report_shot if self.action == 'REPORT' else self._publish_shot
+        # the work is waiting on the share or on child processes, so threads are enough
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="shot_batch") as pool:
+            list(pool.map(self._run_shot, [(step, r) for r in self.results]))
+        self.seconds = time.perf_counter() - start
+        self.finished = True
+        print(f"Shot batch {self.action.lower()}: {self.counts()} in {self.seconds:.1f}s")
+
+    def _run_shot(self, args):
+        step, result = args
+        if self.cancelled:
+            result.update(state='SKIPPED', message="Cancelled")
+            return
+        start = time.perf_counter()
+        result["state"] = 'RUNNING'
+        try:
+            step(result)
+        except Exception as e:
+            result.update(state='FAILED', message=str(e))
+        result["seconds"] = time.perf_counter() - start
+
+    def _report_shot(self, result):
+        for subfolder in ("wip", "publish"):
+            result[subfolder] = get_latest_version(shot_folder(self.series_root, subfolder, *result["key"]), result["shot"])
+        result.update(state='DONE', message="")
+
+    def _publish_shot(self, result):
+        wip_file = get_latest_version(shot_folder(self.series_root, "wip", *result["key"]), result["shot"])
+        result["wip"] = wip_file
+        if not wip_file:
+            result.update(state='SKIPPED', message="No WIP found")
+            return
+        if self.dedup_store:
+            materialize_version(wip_file, self.dedup_store)
+
+        publish_dir = shot_folder(self.series_root, "publish", *result["key"])
+        os.makedirs(publish_dir, exist_ok=True)
+        filename = get_next_increment_filename(publish_dir, result["shot"])
+        dest = os.path.join(publish_dir, filename)
+        policy = SAVE_POLICIES["publish"]
+        cmd = [self._blender, "-b", "--factory-startup", wip_file,
+               "--python-exit-code", "1", "--python-expr", _BATCH_PUBLISH_SCRIPT,
+               "--", json.dumps(dict(path=dest, compress=save_compressed("publish", bool(self.dedup_store)),
+                                     relative_remap=policy["relative_remap"]))]
+        try:
+            proc = subprocess.run(cmd, capture_output=True, text=True, timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            raise RuntimeError(f"Blender timed out after {self.timeout}s")
+        if proc.returncode or f"PUBLISHED {dest}" not in proc.stdout:
+            stderr_tail = proc.stderr.strip().splitlines()[-1:] or [""]
+            raise RuntimeError(f"Blender exited {proc.returncode}: {stderr_tail[0]}")
+
+        record_saved_version(publish_dir, filename)
+        # already off the main thread, so no need for the post-save pool
+        if policy["recompress"] and not self.dedup_store and recompress_backend():
+            recompress_blend(dest)
+        if self.dedup_store:
+            dedup_older_versions(publish_dir, filename, self.dedup_store)
+        result.update(state='DONE', message=f"Published {filename}", publish=dest)
+
+    def report_lines(self):
+        lines = [f"{'Shot':<28} {'State':<8} {'Latest WIP':<12} {'Latest Publish':<16} {'Time':>6}  Message"]
+        def version(path):
+            number = parse_version_filename(os.path.basename(path))[1] if path else None
+            return f"v{number:03d}" if number is not None else "-"
+        for r in self.results:
+            lines.append(f"{r['shot']:<28} {r['state']:<8} {version(r['wip']):<12} {version(r['publish']):<16} "
+                         f"{r['seconds']:>5.1f}s  {r['message']}")
+        lines.append(f"{self.action.title()}: {self.counts()} in {self.seconds:.1f}s")
+        return lines
+
+    def write_csv(self, path):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["shot", "state", "wip", "publish", "seconds", "message"])
+            for r in self.results:
+                writer.writerow([r["shot"], r["state"], r["wip"] or "", r["publish"] or "", round(r["seconds"], 3), r["message"]])
+
+_shot_batch = None  # the batch shown in the panel
+
+def _watch_shot_batch():
+    """bpy.app.timers callback: redraw the progress and write the report once the batch is done."""
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+    if _shot_batch is None or not _shot_batch.finished:
+        return 0.5 if _shot_batch is not None else None
+    text = bpy.data.texts.get(BATCH_REPORT_TEXT) or bpy.data.texts.new(BATCH_REPORT_TEXT)
+    text.from_string("\n".join(_shot_batch.report_lines()) + "\n")
+    invalidate_dir_cache()
+    return None
+
+def batch_main(argv):
+    parser = argparse.ArgumentParser(prog="Pipeline-ShotManager.py", description="Publish or report every shot of an episode or sequence.")
+    parser.add_argument("--root", required=True, help="Series directory containing wip/Shots and publish")
+    parser.add_argument("--episode", required=True)
+    parser.add_argument("--sequence", help="Only this sequence (default: every sequence in the episode)")
+    parser.add_argument("--report-only", action="store_true", help="Only report the latest WIP/publish versions")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2), help="Blender processes at once")
+    parser.add_argument("--dedup", action="store_true", help="Store older publish versions as chunk manifests (they need restoring before they can be opened or linked)")
+    parser.add_argument("--timeout", type=float, default=BATCH_SHOT_TIMEOUT, help="Seconds before a shot's Blender is stopped and the shot failed")
+    parser.add_argument("--csv", help="Also write the report to this CSV file")
+    args = parser.parse_args(argv)
+
+    series_root = os.path.abspath(args.root)
+    shots = list_batch_shots(series_root, args.episode, args.sequence)
+    batch = ShotBatch(series_root, shots, 'REPORT' if args.report_only else 'PUBLISH', args.workers, args.dedup, args.timeout)
+    batch.run()
+    print("\n".join(batch.report_lines()))
+    if args.csv:
+        batch.write_csv(args.csv)
+    return 1 if batch.counts().get('FAILED') else 0
+
 # Operators
 class SaveWIP(Operator):
     bl_idname = "shot.save_wip"
@@ -165,6 +502,8 @@ class PublishShot(Operator):
         try:
             path = logic.save("publish", incremental=True)
             self.report({'INFO'}, f"Published: {path}")
+            if recompress_fallback("publish"):
+                self.report({'WARNING'}, RECOMPRESS_FALLBACK_MESSAGE)
             return {'FINISHED'}
         except Exception as e:
             self.report({'ERROR'}, f"Publish failed: {e}")
@@ -178,8 +517,9 @@ class LoadLatestWIP(Operator):
         props = context.scene.shot_selector_props
         path = props.get_shot_path("wip")
         base = f"{props.episode_name}_{props.sequence_name}_{props.shot_name}"
-        file = get_latest_version(path, base)
+        file = get_latest_version(path, base, get_catalog(bpy.path.abspath(props.series_directory)))
         if file:
+            materialize_version(file, get_dedup_store(props))
             bpy.ops.wm.open_mainfile(filepath=file)
             self.report({'INFO'}, f"Loaded: {file}")
             return {'FINISHED'}
@@ -194,14 +534,87 @@ class LoadLatestPublish(Operator):
         props = context.scene.shot_selector_props
         path = props.get_shot_path("publish")
         base = f"{props.episode_name}_{props.sequence_name}_{props.shot_name}"
-        file = get_latest_version(path, base)
+        file = get_latest_version(path, base, get_catalog(bpy.path.abspath(props.series_directory)))
         if file:
+            materialize_version(file, get_dedup_store(props))
             bpy.ops.wm.open_mainfile(filepath=file)
             self.report({'INFO'}, f"Loaded: {file}")
             return {'FINISHED'}
         self.report({'ERROR'}, "No publish found")
         return {'CANCELLED'}
 
+class RefreshShotListing(Operator):
+    bl_idname = "shot.refresh_listing"
+    bl_label = "Refresh"
+    bl_description = "Re-read Episodes, Sequences and Shots from the Series Directory"
+
+    def execute(self, context):
+        invalidate_dir_cache()
+        clear_catalog_search()
+        series_root = bpy.path.abspath(context.scene.shot_selector_props.series_directory)
+        if os.path.isdir(series_root):
+            queue_catalog_sync(series_root)
+            self.report({'INFO'}, "Catalog refresh started in the background")
+        for area in context.screen.areas:
+            area.tag_redraw()
+        return {'FINISHED'}
+
+class OpenCatalogVersion(Operator):
+    bl_idname = "shot.open_version"
+    bl_label = "Open Version"
+    bl_description = "Open this version from the series catalog"
+
+    filepath: StringProperty()
+
+    def execute(self, context):
+        if not os.path.isfile(self.filepath):
+            self.report({'ERROR'}, f"Not found (catalog out of date?): {self.filepath}")
+            return {'CANCELLED'}
+        materialize_version(self.filepath, get_dedup_store(context.scene.shot_selector_props))
+        bpy.ops.wm.open_mainfile(filepath=self.filepath)
+        self.report({'INFO'}, f"Loaded: {self.filepath}")
+        return {'FINISHED'}
+
+class ShotBatchRun(Operator):
+    bl_idname = "shot.batch_run"
+    bl_label = "Batch Shots"
+    bl_description = "Publish or report every shot in the selected sequence or episode using background Blender processes"
+
+    action: EnumProperty(items=[("PUBLISH", "Publish Latest WIPs", ""), ("REPORT", "Version Report", "")])
+
+    def execute(self, context):
+        global _shot_batch
+        props = context.scene.shot_selector_props
+        if _shot_batch is not None and not _shot_batch.finished:
+            self.report({'ERROR'}, "A shot batch is already running")
+            return {'CANCELLED'}
+        if not props.episode_name or (props.batch_scope == "SEQUENCE" and not props.sequence_name):
+            self.report({'ERROR'}, "Select an Episode (and Sequence) first!")
+            return {'CANCELLED'}
+
+        series_root = bpy.path.abspath(props.series_directory)
+        sequence = props.sequence_name if props.batch_scope == "SEQUENCE" else None
+        shots = list_batch_shots(series_root, props.episode_name, sequence)
+        if not shots:
+            self.report({'ERROR'}, "No shots found")
+            return {'CANCELLED'}
+        _shot_batch = ShotBatch(series_root, shots, self.action, props.batch_workers, props.use_dedup_storage)
+        _shot_batch.start()
+        if not bpy.app.timers.is_registered(_watch_shot_batch):
+            bpy.app.timers.register(_watch_shot_batch, first_interval=0.5)
+        self.report({'INFO'}, f"Started batch on {len(shots)} shots, report goes to the '{BATCH_REPORT_TEXT}' text")
+        return {'FINISHED'}
+
+class ShotBatchCancel(Operator):
+    bl_idname = "shot.batch_cancel"
+    bl_label = "Cancel Batch"
+    bl_description = "Skip the shots that haven't started yet"
+
+    def execute(self, context):
+        if _shot_batch is not None:
+            _shot_batch.cancel()
+        return {'FINISHED'}
+
 # UI Panel
 class ShotManagerPanel(Panel):
     bl_label = "Shot Manager"
@@ -214,7 +627,9 @@ class ShotManagerPanel(Panel):
         layout = self.layout
         props = context.scene.shot_selector_props
 
-        layout.prop(props, "series_directory")
+        row = layout.row(align=True)
+        row.prop(props, "series_directory")
+        row.operator("shot.refresh_listing", text="", icon='FILE_REFRESH')
         layout.separator()
 
         col = layout.box().column()
@@ -235,12 +650,57 @@ class ShotManagerPanel(Panel):
         row.prop(props, "shot_enum", text="")
         row.prop(props, "shot_name", text="")
 
+        layout.prop(props, "use_dedup_storage")
         layout.separator()
         col = layout.column(align=True)
         col.operator("shot.load_latest_wip", text="Shot Load WIP", icon='VIEW_CAMERA_UNSELECTED')
         col.operator("shot.save_wip", text="Shot Save WIP", icon='CON_CAMERASOLVER')
         layout.separator()
 
+        layout.prop(props, "version_search", text="", icon='VIEWZOOM')
+        if props.version_search:
+            col = layout.column(align=True)
+            rows = search_catalog(bpy.path.abspath(props.series_directory), props.version_search)
+            for path, version, size in rows:
+                op = col.operator("shot.open_version", text=f"{os.path.basename(path)}  ({size / 1048576:.1f} MB)", icon='FILE_BLEND')
+                op.filepath = path
+            if not rows:
+                col.label(text="No matches in the series catalog")
+
+
+class ShotBatchPanel(Panel):
+    bl_label = "Batch"
+    bl_idname = "VIEW3D_PT_shot_manager_batch"
+    bl_parent_id = "VIEW3D_PT_shot_manager"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = 'Two Pints'
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        layout = self.layout
+        props = context.scene.shot_selector_props
+
+        row = layout.row(align=True)
+        row.prop(props, "batch_scope", expand=True)
+        layout.prop(props, "batch_workers")
+        running = _shot_batch is not None and not _shot_batch.finished
+        col = layout.column(align=True)
+        col.enabled = not running
+        col.operator("shot.batch_run", text="Publish Latest WIPs", icon='EXPORT').action = 'PUBLISH'
+        col.operator("shot.batch_run", text="Version Report", icon='TEXT').action = 'REPORT'
+
+        if _shot_batch is not None:
+            counts = _shot_batch.counts()
+            done = len(_shot_batch.results) - counts.get('QUEUED', 0) - counts.get('RUNNING', 0)
+            box = layout.box()
+            box.label(text=f"{_shot_batch.action.title()}: {done}/{len(_shot_batch.results)} shots",
+                      icon='TIME' if running else 'CHECKMARK')
+            if counts.get('FAILED'):
+                box.label(text=f"{counts['FAILED']} failed, see '{BATCH_REPORT_TEXT}'", icon='ERROR')
+            if running:
+                box.operator("shot.batch_cancel", icon='X')
+
 
 # Registration
 classes = [
@@ -249,18 +709,37 @@ classes = [
     PublishShot,
     LoadLatestWIP,
     LoadLatestPublish,
-    ShotManagerPanel
+    RefreshShotListing,
+    OpenCatalogVersion,
+    ShotBatchRun,
+    ShotBatchCancel,
+    ShotManagerPanel,
+    ShotBatchPanel
 ]
 
 def register():
     for cls in classes:
         bpy.utils.register_class(cls)
     bpy.types.Scene.shot_selector_props = PointerProperty(type=ShotSelectorProperties)
+    bpy.app.timers.register(_watch_timer, first_interval=1.0, persistent=True)
 
 def unregister():
+    if _shot_batch is not None:
+        _shot_batch.cancel()
+    if bpy.app.timers.is_registered(_watch_shot_batch):
+        bpy.app.timers.unregister(_watch_shot_batch)
+    if bpy.app.timers.is_registered(_watch_timer):
+        bpy.app.timers.unregister(_watch_timer)
+    shutdown_post_save_pool()
+    close_catalogs()
+    invalidate_dir_cache()
+    stop_watcher(WATCH_CLIENT)
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
     del bpy.types.Scene.shot_selector_props
 
 if __name__ == "__main__":
+    # command line batch: blender -b -P Pipeline-ShotManager.py -- --root ... --episode ...
+    if bpy.app.background and "--" in sys.argv:
+        sys.exit(batch_main(sys.argv[sys.argv.index("--") + 1:]))
     register()
@@ -1,17 +1,34 @@
 import bpy
-import os # Import the os module for path manipulation
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
 
-def setup_compositor_file_output():
-    """
-    Sets up a File Output node in the compositor, connecting it to a
-    specified group output node and configuring its path and format.
-    """
+# Shared modules (pipeline_paths.py, compositor_nodes.py) live next to the scripts
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+from pipeline_paths import pure_path, output_path, OUTPUT_FORMATS, apply_output_format
+from compositor_nodes import GROUP_NODE_TYPES, NodeTreeIndex
 
-    # Ensure we are in the compositor and use nodes
-    bpy.context.scene.use_nodes = True
-    tree = bpy.context.scene.node_tree
+# Define the potential target node group names (both definition and instance names), in order of preference
+TARGET_GROUP_NAMES = [
+    "Daytime.CompTree",
+    "Nighttime.CompTree",
+    "Dusktime.CompTree",
+    "Dusk.CompTree", # name used by Render-CreateNodeTree.py
+]
+
+# Format profile of the File Output node, see OUTPUT_FORMATS in pipeline_paths.py
+FILE_OUTPUT_FORMAT = "png8"
 
-    # --- Debugging Compositor Nodes ---
+
+def print_compositor_nodes(tree):
+    """Debug dump of every node in the compositor tree."""
     print("--- Debugging Compositor Nodes (Full Scan) ---")
     if not tree.nodes:
         print("No nodes found in the current compositor tree.")
@@ -27,96 +44,100 @@ def setup_compositor_file_output():
             else:
                 print(f"DEBUG:   (Not a recognized NODE_GROUP type, skipping group definition check)")
     print("--- End Debugging Compositor Nodes (Full Scan) ---")
-    # --- End Debugging Compositor Nodes ---
-
-
-    # Define the potential target node group names (both definition and instance names)
-    target_names = [
-        "Daytime.CompTree",
-        "Nighttime.CompTree",
-        "Dusktime.CompTree"
-    ]
-
-    # Find the first available target group output node instance in the compositor
-    target_output_node = None
-    for node in tree.nodes:
-        # Check if the node is a group node (an instance of a node group), handling both type representations
-        if node.type == 'NODE_GROUP' or node.type == 'GROUP':
-            # Check if the name of the *definition* of the node group matches a target,
-            # OR if the *instance name* of the node in the compositor matches a target.
-            # We also ensure node.node_tree exists before accessing its name.
-            if (node.node_tree and node.node_tree.name in target_names) or (node.name in target_names):
-                target_output_node = node
-                # Print the relevant name that caused the match
-                matched_by = "instance name" if node.name in target_names else "definition name"
-                print(f"Found target node group instance: '{node.name}' (definition: '{node.node_tree.name if node.node_tree else 'N/A'}') - Matched by: {matched_by}")
-                break
 
-    if not target_output_node:
-        print(f"Error: None of the specified target node group definitions or instance names ({', '.join(target_names)}) found as instances in the compositor.")
-        return
 
-    # Check if a File Output node already exists to avoid duplicates
-    file_output_node = None
-    for node in tree.nodes:
-        if node.type == 'OUTPUT_FILE' and node.name == "RenderFileOutput":
-            file_output_node = node
-            print("Existing File Output node 'RenderFileOutput' found. Updating it.")
-            break
-
-    # If no existing node, create a new File Output node
-    if not file_output_node:
-        file_output_node = tree.nodes.new(type='CompositorNodeOutputFile')
-        file_output_node.name = "RenderFileOutput"
-        print("New File Output node 'RenderFileOutput' created.")
-
-    # Get the scene's current render output path
-    full_render_filepath = bpy.data.scenes['Scene'].render.filepath
+def find_target_group_node(index, names=TARGET_GROUP_NAMES):
+    """
+    Returns (node, matched name) for the group node whose definition name or
+    instance name comes first in names, or (None, None).
+    """
+    for name in names:
+        nodes = index.group_nodes(name)
+        if nodes:
+            return nodes[0], name
+        node = index.node(name)
+        if node and node.type in GROUP_NODE_TYPES:
+            return node, name
+    return None, None
 
-    # --- Start of logic for base path and subpath ---
 
-    # Get the original filename (e.g., 'KWI_003_SQ01_0130_Render_Ready_v002_####.exr')
-    original_filename_with_ext = os.path.basename(full_render_filepath)
+def setup_compositor_file_output(scene=None, verbose=True, output_format=FILE_OUTPUT_FORMAT):
+    """
+    Sets up a File Output node in the compositor, connecting it to a
+    specified group output node and configuring its path and format.
+
+    Returns a summary dict (status, group, file_output, base_path, subpath,
+    link, error). verbose=False leaves out the node dump and step prints.
+    """
+    log = print if verbose else (lambda *args: None)
+    result = {"status": "failed", "format": "", "group": "", "file_output": "", "base_path": "", "subpath": "", "link": "", "error": ""}
 
-    # Split the filename and extension (e.g., 'KWI_003_SQ01_0130_Render_Ready_v002_####')
-    filename_without_ext, _ = os.path.splitext(original_filename_with_ext)
+    # Ensure we are in the compositor and use nodes
+    scene = scene or bpy.context.scene
+    scene.use_nodes = True
+    tree = scene.node_tree
 
-    # Create the folder name by removing '_####' from the filename
-    # Example: "KWI_003_SQ01_0130_Render_Ready_v002_####" -> "KWI_003_SQ01_0130_Render_Ready_v002"
-    folder_name_from_file = filename_without_ext.replace('_####', '')
+    if verbose:
+        print_compositor_nodes(tree)
+    index = NodeTreeIndex(tree)
 
-    # Extract the directory containing 'exr' (e.g., 'X:\...\v002\exr')
-    render_directory = os.path.dirname(full_render_filepath)
+    # Find the target group output node instance in the compositor
+    target_output_node, matched_name = find_target_group_node(index)
+    if not target_output_node:
+        result["error"] = f"None of the specified target node group definitions or instance names ({', '.join(TARGET_GROUP_NAMES)}) found as instances in the compositor."
+        log(f"Error: {result['error']}")
+        return result
+    result["group"] = target_output_node.name
+    matched_by = "instance name" if target_output_node.name == matched_name else "definition name"
+    log(f"Found target node group instance: '{target_output_node.name}' (definition: '{target_output_node.node_tree.name if target_output_node.node_tree else 'N/A'}') - Matched by: {matched_by}")
 
-    # Go up one level to get the 'v002' directory (e.g., 'X:\...\v002')
-    version_directory = os.path.dirname(render_directory)
+    # Check if a File Output node already exists to avoid duplicates
+    file_output_node = index.node("RenderFileOutput")
+    if file_output_node and file_output_node.type == 'OUTPUT_FILE':
+        result["file_output"] = "updated"
+        log("Existing File Output node 'RenderFileOutput' found. Updating it.")
+    else:
+        # If no existing node, create a new File Output node
+        file_output_node = index.new_node('CompositorNodeOutputFile', "RenderFileOutput")
+        result["file_output"] = "created"
+        log("New File Output node 'RenderFileOutput' created.")
 
-    # Construct the new base path, adding the folder derived from the filename
-    # The empty string as the last argument ensures a trailing slash.
-    # Example: 'X:\...\v002' + 'KWI_003_SQ01_0130_Render_Ready_v002' + '\'
-    new_base_path = os.path.join(version_directory, folder_name_from_file, "")
+    # Get the scene's current render output path, made absolute: a Blender relative
+    # '//Render/...' path would otherwise parse as a UNC drive
+    full_render_filepath = bpy.path.abspath(scene.render.filepath)
 
-    # Set the base path for the File Output node
+    # --- Start of logic for base path and subpath ---
+
+    # e.g. 'X:\...\v002\exr\KWI_003_SQ01_0130_Render_Ready_v002_####.exr' gives
+    # render_parent 'X:\...\v002' and render_name 'KWI_003_SQ01_0130_Render_Ready_v002'
+    render_path = pure_path(full_render_filepath)
+    render_fields = {
+        "render_parent": render_path.parent.parent,
+        "render_name": render_path.stem.replace('_####', ''),
+    }
+
+    # Set the base path for the File Output node ('X:\...\v002\KWI_003_SQ01_0130_Render_Ready_v002\')
+    new_base_path = output_path("compositor_dir", **render_fields)
     file_output_node.base_path = new_base_path
-    print(f"File Output base directory set to: {new_base_path}")
+    result["base_path"] = new_base_path
+    log(f"File Output base directory set to: {new_base_path}")
 
-    # Construct the new subpath with the PNG extension and the '.####' sequence
-    # This specifically targets the sequence part before the frame numbers for the subpath.
-    corrected_filename_portion = filename_without_ext.replace('_####', '.####')
-    new_subpath = f"{corrected_filename_portion}.png"
+    # Subpath with the PNG extension and the '.####' sequence ('KWI_003_SQ01_0130_Render_Ready_v002.####.png')
+    new_subpath = output_path("compositor_slot", **render_fields)
 
     # Set the subpath for the first file slot (default output)
     if file_output_node.file_slots:
         file_output_node.file_slots[0].path = new_subpath
-        print(f"File Output subpath set to: {new_subpath}")
+        result["subpath"] = new_subpath
+        log(f"File Output subpath set to: {new_subpath}")
     else:
-        print("Warning: No file slots found on the File Output node. Cannot set subpath.")
+        log("Warning: No file slots found on the File Output node. Cannot set subpath.")
 
     # --- End of logic ---
 
-    # Set the file format to PNG (ensures node's internal settings are correct)
-    file_output_node.format.file_format = 'PNG'
-    file_output_node.format.color_mode = 'RGBA' # Usually good for PNGs
+    # Set the file format from the profile (ensures node's internal settings are correct)
+    apply_output_format(file_output_node.format, output_format)
+    result["format"] = output_format
 
     # Position the new node (optional, for better layout)
     file_output_node.location = (target_output_node.location.x + 300, target_output_node.location.y)
@@ -124,19 +145,122 @@ def setup_compositor_file_output():
     # Connect the output of the target group node to the input of the File Output node
     if target_output_node.outputs.get("Image") and file_output_node.inputs.get("Image"):
         # Check if a link already exists to prevent duplicates
-        links_exist = False
-        for link in tree.links:
-            if link.from_node == target_output_node and link.to_node == file_output_node:
-                links_exist = True
-                print("Link already exists between target node and File Output node.")
-                break
-        if not links_exist:
-            tree.links.new(target_output_node.outputs["Image"], file_output_node.inputs["Image"])
-            print("Successfully linked target node to File Output node.")
+        if index.links_between(target_output_node, file_output_node):
+            result["link"] = "existing"
+            log("Link already exists between target node and File Output node.")
+        else:
+            index.new_link(target_output_node.outputs["Image"], file_output_node.inputs["Image"])
+            result["link"] = "new"
+            log("Successfully linked target node to File Output node.")
     else:
-        print("Warning: Could not find 'Image' output on target node or 'Image' input on File Output node.")
+        result["link"] = "missing"
+        log("Warning: Could not find 'Image' output on target node or 'Image' input on File Output node.")
+
+    result["status"] = "done"
+    return result
+
+
+# --- Batch wiring (command line) ---
+# Wires the File Output node in many shot files without opening them, one `blender -b`
+# per file, at most --workers at a time, and writes one CSV row per file:
+#   blender -b --factory-startup -P Render-AddCompositorOutputNode.py -- batch-wire shots/*.blend
+#       [--workers 4] [--no-save] [--timeout 300] [--format png8] [--csv compositor_wiring.csv]
+WIRE_RESULT_PREFIX = "WIRE_RESULT "
+WIRE_FILE_TIMEOUT = 300 # seconds before a file's Blender is stopped and the file reported as failed
+WIRE_CSV_COLUMNS = ["file", "status", "format", "group", "file_output", "base_path", "subpath", "link", "seconds", "error"]
+
+
+def wire_open_file(save=True, output_format=FILE_OUTPUT_FORMAT):
+    """Wire the open file's compositor and save it. Runs inside the worker Blender."""
+    try:
+        result = setup_compositor_file_output(verbose=False, output_format=output_format)
+    except Exception as e:
+        result = {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+    if save and result["status"] == "done":
+        bpy.ops.wm.save_mainfile()
+    result["file"] = bpy.data.filepath
+    return result
+
+
+def _wire_one_file(blend_path, save, timeout, output_format):
+    cmd = [bpy.app.binary_path, "-b", "--factory-startup", blend_path, "--python-exit-code", "1",
+           "-P", os.path.abspath(__file__), "--", "wire-file", "--format", output_format]
+    if not save:
+        cmd.append("--no-save")
+    start = time.perf_counter()
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        result = None
+        for line in proc.stdout.splitlines():
+            if line.startswith(WIRE_RESULT_PREFIX):
+                result = json.loads(line[len(WIRE_RESULT_PREFIX):])
+        if result is None:
+            stderr_tail = proc.stderr.strip().splitlines()[-1:] or [""]
+            result = {"status": "failed", "error": f"Blender exited {proc.returncode}: {stderr_tail[0]}"}
+    except subprocess.TimeoutExpired:
+        result = {"status": "failed", "error": f"timed out after {timeout}s"}
+    result["file"] = blend_path
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def _expand_blend_paths(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in sorted(names) if name.endswith(".blend"))
+        else:
+            files.append(path)
+    return [os.path.abspath(f) for f in files]
+
+
+def run_batch_wire(args):
+    files = _expand_blend_paths(args.files)
+    print(f"Batch compositor wiring: {len(files)} files, {args.workers} workers")
+    start = time.perf_counter()
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        for result in pool.map(lambda f: _wire_one_file(f, not args.no_save, args.timeout, args.format), files):
+            results.append(result)
+
+    with open(args.csv, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=WIRE_CSV_COLUMNS, extrasaction="ignore", restval="")
+        writer.writeheader()
+        writer.writerows(results)
+    failed = sum(1 for r in results if r["status"] != "done")
+    print(f"Batch compositor wiring finished: {len(results) - failed} done, {failed} failed "
+          f"in {time.perf_counter() - start:.1f}s, summary in {os.path.abspath(args.csv)}")
+    return 1 if failed else 0
+
+
+def batch_main(argv):
+    parser = argparse.ArgumentParser(prog="Render-AddCompositorOutputNode.py",
+                                     description="Wire the compositor File Output node in many shot files.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser("batch-wire", help="Wire many .blend files in background Blender processes")
+    batch.add_argument("files", nargs="+", help=".blend files or folders to search for them")
+    batch.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    batch.add_argument("--no-save", action="store_true", help="Wire the files without saving them")
+    batch.add_argument("--timeout", type=float, default=WIRE_FILE_TIMEOUT, help="Seconds before a file's Blender is stopped and the file failed")
+    batch.add_argument("--csv", default="compositor_wiring.csv", help="Summary CSV, one row per file")
+    batch.add_argument("--format", default=FILE_OUTPUT_FORMAT, choices=list(OUTPUT_FORMATS), help="File Output format profile")
+
+    one = commands.add_parser("wire-file", help="Internal: wire the file Blender opened")
+    one.add_argument("--no-save", action="store_true")
+    one.add_argument("--format", default=FILE_OUTPUT_FORMAT, choices=list(OUTPUT_FORMATS))
+
+    args = parser.parse_args(argv)
+    if args.command == "batch-wire":
+        return run_batch_wire(args)
+    print(WIRE_RESULT_PREFIX + json.dumps(wire_open_file(save=not args.no_save, output_format=args.format)), flush=True)
+    return 0
 
 
 # Call the function to run the script
 if __name__ == "__main__":
+    # command line batch: blender -b -P Render-AddCompositorOutputNode.py -- batch-wire ...
+    if bpy.app.background and "--" in sys.argv:
+        sys.exit(batch_main(sys.argv[sys.argv.index("--") + 1:]))
     setup_compositor_file_output()
@@ -1,54 +1,59 @@
 import bpy
+import os
+import sys
 from pathlib import Path
 
+# Shared modules (pipeline_paths.py, compositor_nodes.py) live next to the scripts
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+from pipeline_paths import output_path, apply_output_format
+from compositor_nodes import NodeTreeIndex
+
 # --- Configuration ---
 SOURCE_NODE_TREE_NAMES = [
     "Daytime.CompTree",
     "Dusk.CompTree",
     "Nighttime.CompTree"
 ]
+# "group": one File Output fed by the group node above
+# "layers": one File Output per rendered view layer with a slot for each of its passes
+OUTPUT_MODE = "group"
+# Name of the group File Output, the per layer ones are LayerOutput.<view layer>
+GROUP_OUTPUT_NAME = "GroupFileOutput"
+# Format profiles (see OUTPUT_FORMATS in pipeline_paths.py) of the group File Output and the per layer ones
+GROUP_OUTPUT_FORMAT = "png8"
+LAYER_OUTPUT_FORMAT = "exr_zip_half"
 
 def build_output_paths(context):
     """Derive output directory and file-slot path from the .blend name and render base path."""
-    blend_path = Path(bpy.data.filepath)
-    stem_parts = blend_path.stem.split("_")
-
-    if len(stem_parts) < 7:
-        raise ValueError("Blend filename must contain at least 7 underscore-separated parts.")
-
-    aa, bb, cc, dd, ee, ff, gg = stem_parts[:7]
-    ver_token = gg
-
-    # slot subpath: AA_BB_CC_DD_EE_FF_v001.####.png
-    file_slot_name = f"{aa}_{bb}_{cc}_{dd}_{ee}_{ff}_{ver_token}.####.png"
-
     # base render path (resolve relative // paths)
-    render_base = Path(bpy.path.abspath(context.scene.render.filepath))
+    render_base = bpy.path.abspath(context.scene.render.filepath)
 
-    # directory name: AA_BB_CC_DD_v001
-    dir_name = f"{aa}_{bb}_{cc}_{dd}_{ver_token}"
-    output_dir = render_base / dir_name
-    output_dir.mkdir(parents=True, exist_ok=True)
+    # directory name: AA_BB_CC_DD_v001, slot subpath: AA_BB_CC_DD_EE_FF_v001.####.png
+    output_dir = output_path("node_tree_dir", render_base=render_base)
+    file_slot_name = output_path("node_tree_slot")
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
 
-    return str(output_dir), file_slot_name
+    return output_dir, file_slot_name
 
 
-def find_source_group_node(tree):
-    for node in tree.nodes:
-        if node.type == 'GROUP' and getattr(node, "node_tree", None):
-            if node.node_tree.name in SOURCE_NODE_TREE_NAMES:
-                return node
+def find_source_group_node(index):
+    for name in SOURCE_NODE_TREE_NAMES:
+        nodes = index.group_nodes(name)
+        if nodes:
+            return nodes[0]
     return None
 
 
-def find_or_create_file_output_node(tree, source_node):
-    """Reuse existing OUTPUT_FILE node if present; otherwise create one."""
-    for node in tree.nodes:
-        if node.type == 'OUTPUT_FILE':
-            print("Reusing existing File Output node.")
-            return node
+def find_or_create_file_output_node(index, source_node):
+    """Reuse the group File Output (GROUP_OUTPUT_NAME) if present; otherwise create one."""
+    node = index.node(GROUP_OUTPUT_NAME)
+    if node is not None and node.type == 'OUTPUT_FILE':
+        print(f"Reusing existing File Output node '{GROUP_OUTPUT_NAME}'.")
+        return node
 
-    file_output_node = tree.nodes.new(type='CompositorNodeOutputFile')
+    file_output_node = index.new_node('CompositorNodeOutputFile', GROUP_OUTPUT_NAME)
     # place it to the right of source
     file_output_node.location.x = source_node.location.x + source_node.width + 150
     file_output_node.location.y = source_node.location.y
@@ -64,8 +69,9 @@ def setup_file_output():
     if not tree:
         print("No compositor node tree found.")
         return
+    index = NodeTreeIndex(tree)
 
-    source_node = find_source_group_node(tree)
+    source_node = find_source_group_node(index)
     if not source_node:
         print(f"No group node found using: {', '.join(SOURCE_NODE_TREE_NAMES)}")
         return
@@ -76,11 +82,15 @@ def setup_file_output():
         print(f"Output path build failed: {ex}")
         return
 
-    file_output_node = find_or_create_file_output_node(tree, source_node)
+    file_output_node = find_or_create_file_output_node(index, source_node)
 
     # update settings
     file_output_node.base_path = output_dir
-    file_output_node.format.file_format = 'PNG'
+    apply_output_format(file_output_node.format, GROUP_OUTPUT_FORMAT)
+
+    # clear old links (before the slots they go into are removed)
+    for link in index.links_into(file_output_node):
+        index.remove_link(link)
 
     # reset slots
     while file_output_node.file_slots:
@@ -92,16 +102,116 @@ def setup_file_output():
         print(f"Source node '{source_node.name}' has no outputs.")
         return
 
-    # clear old links
-    for link in list(tree.links):
-        if link.to_node == file_output_node:
-            tree.links.remove(link)
-
-    tree.links.new(source_node.outputs[0], file_output_node.inputs[0])
+    index.new_link(source_node.outputs[0], file_output_node.inputs[0])
 
     print(f"✅ File Output ready: {output_dir}/{file_slot_name}")
 
 
+def find_or_create_render_layers_node(index, scene, view_layer):
+    """Render Layers node showing view_layer, created in a column on the left if there is none."""
+    for node in index.of_type('R_LAYERS'):
+        if node.layer == view_layer.name and node.scene == scene:
+            return node
+    node = index.new_node('CompositorNodeRLayers', f"RenderLayers.{view_layer.name}")
+    node.scene = scene
+    node.layer = view_layer.name
+    node.location.x = -600
+    node.location.y = -500 * (len(index.of_type('R_LAYERS')) - 1)
+    return node
+
+
+def sync_pass_slots(index, file_output_node, passes):
+    """
+    Make the File Output node's slots match passes, a list of (slot path, pass output socket).
+    Slots are matched by path: ones already linked to their pass are left alone, others are
+    relinked, slots for passes no longer enabled are removed and new passes get a slot.
+    Returns counts of (added, removed, relinked, unchanged) slots.
+    """
+    wanted = dict(passes)
+    added = removed = relinked = unchanged = 0
+
+    # drop slots nobody wants (walk backwards so the indices stay valid)
+    for i in reversed(range(len(file_output_node.file_slots))):
+        if file_output_node.file_slots[i].path not in wanted:
+            socket = file_output_node.inputs[i]
+            link = index.link_into(socket)
+            if link is not None:
+                index.remove_link(link)
+            file_output_node.file_slots.remove(socket)
+            removed += 1
+
+    existing = {slot.path: i for i, slot in enumerate(file_output_node.file_slots)}
+    for path, pass_socket in passes:
+        if path in existing:
+            socket = file_output_node.inputs[existing[path]]
+            link = index.link_into(socket)
+            if (link is not None and link.from_node.name == pass_socket.node.name
+                    and link.from_socket.identifier == pass_socket.identifier):
+                unchanged += 1
+                continue
+            relinked += 1
+        else:
+            file_output_node.file_slots.new(path)
+            socket = file_output_node.inputs[len(file_output_node.file_slots) - 1]
+            added += 1
+        index.new_link(pass_socket, socket)
+    return added, removed, relinked, unchanged
+
+
+def setup_layer_file_outputs():
+    """One File Output node per rendered view layer, with a slot for every pass the layer has enabled.
+
+    Returns the names of the view layers whose output paths could not be built.
+    """
+    scene = bpy.context.scene
+    scene.use_nodes = True
+    tree = scene.node_tree
+    if not tree:
+        print("No compositor node tree found.")
+        return
+    index = NodeTreeIndex(tree)
+    render_base = bpy.path.abspath(scene.render.filepath)
+    failed = []
+
+    for view_layer in scene.view_layers:
+        if not view_layer.use:
+            continue
+        layer_node = find_or_create_render_layers_node(index, scene, view_layer)
+        try:
+            output_dir = output_path("layer_dir", render_base=render_base, layer=view_layer.name)
+            passes = []
+            # Alpha goes out with Image as RGBA
+            for socket in layer_node.outputs:
+                if socket.enabled and socket.name != "Alpha":
+                    pass_name = socket.name.replace(" ", "")
+                    passes.append((output_path("layer_slot", layer=view_layer.name, pass_name=pass_name), socket))
+        except ValueError as ex:
+            print(f"{view_layer.name}: output path build failed, layer skipped: {ex}")
+            failed.append(view_layer.name)
+            continue
+
+        name = f"LayerOutput.{view_layer.name}"
+        file_output_node = index.node(name)
+        if file_output_node is None or file_output_node.type != 'OUTPUT_FILE':
+            file_output_node = index.new_node('CompositorNodeOutputFile', name)
+            file_output_node.location.x = layer_node.location.x + layer_node.width + 300
+            file_output_node.location.y = layer_node.location.y
+            # new nodes come with an "Image" slot, sync_pass_slots keeps it only if it is wanted
+        file_output_node.base_path = output_dir
+        apply_output_format(file_output_node.format, LAYER_OUTPUT_FORMAT)
+
+        added, removed, relinked, unchanged = sync_pass_slots(index, file_output_node, passes)
+        print(f"{view_layer.name}: {len(passes)} passes -> {output_dir} "
+              f"({added} added, {removed} removed, {relinked} relinked, {unchanged} unchanged)")
+
+    if failed:
+        print(f"View layers without file outputs: {', '.join(failed)}")
+    return failed
+
+
 # --- Auto-run when you hit "Run Script" ---
 if __name__ == "__main__":
-    setup_file_output()
+    if OUTPUT_MODE == "layers":
+        setup_layer_file_outputs()
+    else:
+        setup_file_output()
@@ -8,8 +8,104 @@ bl_info = {
 
 # give Python access to Blender's functionality
 import bpy
+import os
+import sys
+import csv
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import subprocess
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+# Shared modules (pipeline_paths.py, render_presets.py) live next to the scripts
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+from pipeline_paths import output_path, OUTPUT_FORMATS, apply_output_format
+from render_presets import load_render_presets, compile_render_preset, apply_render_preset
+
 layer_name = ['BG', 'Elements', 'Kiwicano']
 
+# Built-in presets, more can be dropped into the folders of render_presets.RENDER_PRESET_DIRS
+RENDER_PRESETS = {
+    "cycles_final": {
+        'view_layers["ViewLayer"].use': False, # default layer doesn't render
+        "cycles.preview_samples": 0,
+        "render.engine": 'CYCLES',
+        "cycles.feature_set": 'SUPPORTED',
+        "cycles.device": 'GPU',
+        "cycles.use_adaptive_sampling": True,
+        "cycles.adaptive_threshold": 0.01,
+        "cycles.samples": 64,
+        "cycles.adaptive_min_samples": 0,
+        "cycles.time_limit": 0,
+        "cycles.use_denoising": True,
+        "cycles.denoiser": 'OPTIX',
+        "cycles.denoising_input_passes": 'RGB_ALBEDO_NORMAL',
+        "cycles.use_light_tree": True,
+        "cycles.sampling_pattern": 'AUTOMATIC',
+        "cycles.seed": 0,
+        "cycles.sample_offset": 0,
+        "cycles.min_light_bounces": 0,
+        "cycles.min_transparent_bounces": 0,
+        "cycles.max_bounces": 12,
+        "cycles.diffuse_bounces": 4,
+        "cycles.glossy_bounces": 4,
+        "cycles.transmission_bounces": 12,
+        "cycles.volume_bounces": 0,
+        "cycles.transparent_max_bounces": 8,
+        "cycles.sample_clamp_direct": 0,
+        "cycles.sample_clamp_indirect": 10,
+        "cycles.blur_glossy": 1,
+        "cycles.caustics_refractive": False,
+        "cycles.caustics_reflective": False,
+        "cycles.use_fast_gi": False,
+        "cycles.volume_step_rate": 1,
+        "cycles.volume_preview_step_rate": 1,
+        "cycles.volume_max_steps": 4096,
+        "cycles_curves.shape": 'RIBBONS',
+        "cycles_curves.subdivisions": 2,
+        "render.hair_type": 'STRAND',
+        "render.hair_subdiv": 0,
+        "render.use_simplify": False,
+        "render.simplify_subdivision": 1,
+        "render.simplify_child_particles": 1,
+        "cycles.texture_limit": '512',
+        "render.simplify_volumes": 1,
+        "render.use_simplify_normals": False,
+        "render.simplify_subdivision_render": 4,
+        "render.simplify_child_particles_render": 1,
+        "cycles.texture_limit_render": '4096',
+        "cycles.use_camera_cull": False,
+        "cycles.use_distance_cull": False,
+        "render.use_motion_blur": False,
+        "cycles.film_exposure": 1,
+        "cycles.pixel_filter_type": 'BLACKMAN_HARRIS',
+        "render.film_transparent": True,
+        "cycles.film_transparent_glass": False,
+        "render.compositor_device": 'GPU',
+        "render.compositor_precision": 'FULL',
+        "render.threads_mode": 'AUTO',
+        "cycles.use_auto_tile": True,
+        "cycles.tile_size": 32,
+        "render.use_persistent_data": True,
+        "render.preview_pixel_size": '4',
+        "display_settings.display_device": 'sRGB',
+        "view_settings.view_transform": 'Standard',
+        "view_settings.look": 'None',
+        "view_settings.exposure": 0,
+        "view_settings.gamma": 1,
+        "sequencer_colorspace_settings.name": 'sRGB',
+        "render.use_sequencer": False,
+        "render.image_settings.file_format": 'OPEN_EXR_MULTILAYER',
+        "render.use_overwrite": True,
+        "render.use_placeholder": False,
+    },
+}
+
 class VIEW3D_PT_my_custom_panel(bpy.types.Panel):  # class naming convention ‘CATEGORY_PT_name’
 
     # where to add the panel in the UI
@@ -23,61 +119,86 @@ class VIEW3D_PT_my_custom_panel(bpy.types.Panel):  # class naming convention ‘
         """define the layout of the panel"""
         self.layout.operator('render.createlayers')
         self.layout.operator('render.setassetvis')
+        self.layout.operator('render.setassetvis', text="Preview Asset Visibility").dry_run = True
         self.layout.operator('render.set_render_settings')
-        self.layout.operator('render.import_light_assets')
+        self.layout.operator('render.pass_report')
+        self.layout.operator('render.benchmark_output_formats')
+        row = self.layout.row(align=True)
+        for rig in LIGHT_RIGS:
+            row.operator('render.import_light_assets', text=f"{rig} Lights").rig = rig
         col = self.layout.column(align=True)
 
 # organize collections
-def categorize_collection():
-    element_collection = {}  # Dictionary to hold unique elements
-    elementGeo_collection = {}
-    bg_collection = {}       # Dictionary to hold unique background collections
-    bgGeo_collection = {}
-    kiwicano_collection = {}
-    kiwicanoGeo_collection = {}
-    shadow_collection = {}
-    bg_split = {}
-        
-    for collection in bpy.data.collections:
-        name = collection.name
-
-        # Hardcoded exception: Add BG0110_PillSkyDay to kiwicano collections
-        if name.startswith("BG0110_PillSkyDay"):
-            kiwicano_collection[name] = collection
-            kiwicanoGeo_collection[name] = collection
-            continue
-        
-
-        if name.startswith("CH0009") and len(name) > 10 and name[2:6].isdigit() and name.count("_") == 1 and name[-4] == "." and name[-3:].isdigit():
-            kiwicano_collection[name] = collection # should only contain CH0009_Kiwicano
-            
-        elif name.startswith("CH0009") and len(name) > 10 and name[2:6].isdigit() and name.count("_") == 1 and name[-4] == "." and ".Geo" in name:
-            kiwicanoGeo_collection[name] = collection # should only contain CH0009_Kiwicano
-            
-        elif name.startswith("PR") and len(name) > 10 and name[2:6].isdigit() and name.count("_") == 1 and name[-4] == "." and name[-3:].isdigit():
-            element_collection[name] = collection
-            
-        elif name.startswith("PR") and len(name) > 10 and name[2:6].isdigit() and name.count("_") == 1 and name[-4] == "." and ".Geo" in name:
-            elementGeo_collection[name] = collection
-            
-        elif name.startswith("BG") and len(name) > 10 and name[2:6].isdigit() and name.count("_") == 1 and name[-4] == "." and name[-3:].isdigit():
-            bg_collection[name] = collection
-            
-        elif name.startswith("BG") and len(name) > 10 and name[2:6].isdigit() and name.count("_") == 1 and name[-4] == "." and ".Geo" in name:
-            bgGeo_collection[name] = collection
-            
-        elif name.startswith("CH") and len(name) > 10 and name[2:6].isdigit() and name.count("_") == 1 and name[-4] == "." and name[-3:].isdigit():
-            element_collection[name] = collection # should contain all CH#### and PR#### collections EXCEPT for CH0009_Kiwicano
-            
-        elif name.startswith("CH") and len(name) > 10 and name[2:6].isdigit() and name.count("_") == 1 and name[-4] == "." and ".Geo" in name:
-            elementGeo_collection[name] = collection
-        
-        if ".Shd" in name:
-            shadow_collection[name] = collection # should only contain any *.Shd collections
+# Asset collections are named <code>_<Name>.<tail>, e.g. "PR0012_Chair.001" for the asset
+# and "PR0012_Chair.Geo" for its geometry. The asset code picks the categories, exact
+# codes first, then the 2 letter prefix: (category for the asset, category for its .Geo)
+CATEGORY_CODES = {
+    "CH0009": ("canos", "canosGeo"), # CH0009_Kiwicano
+}
+CATEGORY_PREFIXES = {
+    "PR": ("elements", "elementsGeo"),
+    "BG": ("bgs", "bgGeo"),
+    "CH": ("elements", "elementsGeo"), # all CH#### except CH0009_Kiwicano
+}
+# Hardcoded exceptions by name prefix, checked before the naming rules
+CATEGORY_EXCEPTIONS = {
+    "BG0110_PillSkyDay": ("canos", "canosGeo"),
+}
+SHADOW_TAG = ".Shd" # any collection with this in its name also goes to "shadow"
+CATEGORIES = ("elements", "elementsGeo", "bgs", "bgGeo", "canos", "canosGeo", "shadow")
+
+_category_cache = {"fingerprint": None, "result": None}
+
+def parse_collection_name(name):
+    """Split an asset collection name into (code, tail), e.g. ("PR0012", "001"). None if it doesn't follow the naming."""
+    if len(name) <= 10 or name.count("_") != 1 or name[-4] != "." or not name[2:6].isdigit():
+        return None
+    return name[:6], name[-3:]
+
+def classify_collection_name(name):
+    """Categories a collection name belongs to, in one pass over the name."""
+    for prefix, categories in CATEGORY_EXCEPTIONS.items():
+        if name.startswith(prefix):
+            return categories
+    categories = ()
+    parsed = parse_collection_name(name)
+    if parsed:
+        code, tail = parsed
+        rule = CATEGORY_CODES.get(code) or CATEGORY_PREFIXES.get(code[:2])
+        if rule:
+            if tail.isdigit():
+                categories = (rule[0],)
+            elif ".Geo" in name:
+                categories = (rule[1],)
+    if SHADOW_TAG in name:
+        categories += ("shadow",)
+    return categories
 
-    return list(element_collection.values()), list(elementGeo_collection.values()), list(bg_collection.values()), list(bgGeo_collection.values()), list(kiwicano_collection.values()), list(kiwicanoGeo_collection.values()), list(shadow_collection.values())
+def categorize_collection():
+    """Collection names per category (see CATEGORIES) for the current file.
 
-elements, elementsGeo, bgs, bgGeo, canos, canosGeo, shadow = categorize_collection()
+    Cached until the set of collection names changes, so operators can call it every time.
+    """
+    names = tuple(bpy.data.collections.keys())
+    if _category_cache["fingerprint"] != names:
+        result = {category: [] for category in CATEGORIES}
+        for name in names:
+            for category in classify_collection_name(name):
+                result[category].append(name)
+        _category_cache["fingerprint"] = names
+        _category_cache["result"] = result
+    return _category_cache["result"]
+
+def ensure_view_layers(scene, names):
+    """Create the view layers in names that scene doesn't have yet. Returns the names created."""
+    existing = {layer.name for layer in scene.view_layers}
+    created = []
+    for name in names:
+        if name not in existing:
+            scene.view_layers.new(name)
+            existing.add(name)
+            created.append(name)
+    return created
 
 class create_render_layers(bpy.types.Operator):
     """Checks if script has been run before, if not creates required render layers and organizes vis settings per asset"""
@@ -85,177 +206,410 @@ class create_render_layers(bpy.types.Operator):
     bl_label = "Creates Render Layers"
     
     def execute(self, context):
-        # state layers to check and create
-
-        # cycle through each layer and check if any exist in scene that match layer_name
-        def render_layer_exists(layer_name):
-            for layer in bpy.context.scene.view_layers:
-                if layer.name == layer_name:
-                    return True
-            return False
-            
-        # cancle or create layers
-        for layer_name_to_check in layer_name:
-            
-            # cancel if any of layer_name exists in scene
-            if render_layer_exists(layer_name_to_check):
-                print(f"Render layer '{layer_name_to_check}' exists.")
-                render_layer = bpy.context.scene.view_layers[layer_name_to_check]
-                
-            else:
-                # create view layers
-                bpy.ops.scene.view_layer_add(type='NEW')
-                bpy.context.view_layer.name = layer_name_to_check
-                print(f"Render layer '{layer_name_to_check}' does not exist.")
-                print("will create new layers")
-                
+        # create the layers of layer_name the scene doesn't have, no window needed
+        created = ensure_view_layers(context.scene, layer_name)
+        existing = [name for name in layer_name if name not in created]
+        if existing:
+            print(f"Render layers exist: {', '.join(existing)}")
+        if created:
+            print(f"Created render layers: {', '.join(created)}")
+        self.report({'INFO'}, f"{len(created)} render layers created, {len(existing)} already there")
         return {'FINISHED'}
 
                         
 
+# view layer visibility
+# Rules per view layer, applied in order (a later rule wins over an earlier one). Values
+# are LayerCollection properties: exclude, holdout or indirect_only (no layer needs the
+# last one yet). Targets name categories from categorize_collection(); any other name is
+# taken as a collection name (e.g. "Fog").
+#   ("pair", parent, child) - child collections directly under a top-level parent collection
+#   ("tree", category)      - the collections and everything below them
+#   ("self", category)      - the collections themselves
+VISIBILITY_MATRIX = {
+    # Elements = Visible, bg.Geo = Hidden, bg.Shd = Visible, cano = Hidden
+    "Elements": [
+        (("pair", "elements", "elementsGeo"), {"exclude": False}),
+        (("pair", "bgs", "bgGeo"), {"exclude": True}),
+        (("pair", "canos", "canosGeo"), {"exclude": True}),
+        (("pair", "bgs", "shadow"), {"exclude": False}),
+    ],
+    # Elements = Hidden, bg.Geo = Visible, bg.Shd = Hidden, cano = Visible, fog = Visible
+    "BG": [
+        (("pair", "elements", "elementsGeo"), {"exclude": True}),
+        (("pair", "bgs", "bgGeo"), {"exclude": False}),
+        (("pair", "canos", "canosGeo"), {"exclude": False}),
+        (("pair", "bgs", "shadow"), {"exclude": True}),
+    ],
+    # Elements = Hidden, bg = Visible with holdout, bg.Shd = Hidden, cano = Visible, fog = Hidden
+    "Kiwicano": [
+        (("pair", "elements", "elementsGeo"), {"exclude": True}),
+        (("tree", "bgs"), {"holdout": True}),
+        (("pair", "bgs", "bgGeo"), {"exclude": False}),
+        (("pair", "bgs", "Fog"), {"exclude": True}),
+        (("self", "bgs"), {"exclude": False}),
+        (("pair", "canos", "canosGeo"), {"exclude": False}),
+        (("pair", "bgs", "shadow"), {"exclude": True}),
+    ],
+}
+
+class LayerCollectionIndex:
+    """One walk over a view layer's LayerCollection tree.
+
+    Entries are in pre-order, so the subtree of entry i is range(i, subtree_end[i]).
+    """
+    def __init__(self, view_layer):
+        self.layer_cols = []
+        self.paths = []
+        self.parent_names = []
+        self.depths = [] # 0 for the scene collection, 1 for the top-level collections
+        self.subtree_end = []
+        self.by_name = {} # collection name -> entries (a collection can be linked in several places)
+        stack = [(view_layer.layer_collection, None, "", 0)]
+        while stack:
+            layer_col, parent, path, depth = stack.pop()
+            if layer_col is None:
+                self.subtree_end[parent] = len(self.layer_cols) # all children of entry `parent` are done
+                continue
+            i = len(self.layer_cols)
+            self.layer_cols.append(layer_col)
+            self.paths.append(f"{path}/{layer_col.name}" if path else layer_col.name)
+            self.parent_names.append(parent)
+            self.depths.append(depth)
+            self.subtree_end.append(i + 1)
+            self.by_name.setdefault(layer_col.name, []).append(i)
+            stack.append((None, i, None, None))
+            stack.extend((child, layer_col.name, self.paths[i], depth + 1) for child in reversed(layer_col.children))
+
+    def pairs(self, parent_names, child_names):
+        """Entries of child_names whose parent is a top-level collection in parent_names."""
+        parent_names = set(parent_names)
+        return [i for name in child_names for i in self.by_name.get(name, ())
+                if self.depths[i] == 2 and self.parent_names[i] in parent_names]
+
+    def named(self, names):
+        return [i for name in names for i in self.by_name.get(name, ())]
+
+    def subtrees(self, names):
+        return [j for i in self.named(names) for j in range(i, self.subtree_end[i])]
+
+def plan_visibility(index, rules, cats):
+    """Desired {entry: {property: value}} for a view layer from its rules."""
+    resolve = lambda key: cats.get(key, [key])
+    desired = {}
+    for target, values in rules:
+        if target[0] == "pair":
+            entries = index.pairs(resolve(target[1]), resolve(target[2]))
+        elif target[0] == "tree":
+            entries = index.subtrees(resolve(target[1]))
+        else:
+            entries = index.named(resolve(target[1]))
+        for i in entries:
+            desired.setdefault(i, {}).update(values)
+    return desired
+
+def apply_visibility_matrix(scene, matrix=VISIBILITY_MATRIX, dry_run=False):
+    """Bring the view layers to the matrix, writing only values that differ.
+
+    Returns [(view layer, collection path, property, old value, new value)]. Parents are
+    written before their children, as excluding a parent also changes its children.
+    """
+    cats = categorize_collection()
+    changes = []
+    for layer, rules in matrix.items():
+        view_layer = scene.view_layers.get(layer)
+        if view_layer is None:
+            print(f"View layer '{layer}' not found, skipped.")
+            continue
+        index = LayerCollectionIndex(view_layer)
+        for i, values in sorted(plan_visibility(index, rules, cats).items()):
+            layer_col = index.layer_cols[i]
+            for prop, value in values.items():
+                current = getattr(layer_col, prop)
+                if current != value:
+                    changes.append((layer, index.paths[i], prop, current, value))
+                    if not dry_run:
+                        setattr(layer_col, prop, value)
+    return changes
+
 class setAssetVis(bpy.types.Operator):
     """Sets all asset vis settings in created view layers"""
     bl_idname = "render.setassetvis"
     bl_label = "Sets Asset Visibility"
+
+    dry_run: bpy.props.BoolProperty(name="Dry Run", default=False, description="Only report what would change")
     
     def execute(self, context): 
-        # set elements visibility
-        # Elements = Visible
-        # bg.bg.Geo = Visible - holdback = On
-        # bg.bg.Shd = Visible
-        # cano = Hidden
-        # fog = Hidden
-        bpy.context.window.view_layer = bpy.context.scene.view_layers['Elements']
-        for elm in elements:
-            for elmg in elementsGeo:
-                bpy.context.view_layer.layer_collection.children[elm.name].children[elmg.name].exclude = False
-                
-        for bg in bgs:
-            for bgg in bgGeo:
-                bpy.context.view_layer.layer_collection.children[bg.name].children[bgg.name].exclude = True
-
-        for cano in canos:
-            for canog in canosGeo:
-                bpy.context.view_layer.layer_collection.children[cano.name].children[canog.name].exclude = True
-            
-        for shd in shadow:
-            for bg in bgs:
-                bpy.context.view_layer.layer_collection.children[bg.name].children[shd.name].exclude = False
-            
-            
-        # set bg vis
-        # Elements = Hidden
-        # bg.bg.Geo = Visible
-        # bg.bg.Shd = Hidden
-        # cano = Hidden
-        # fog = Visible
-        bpy.context.window.v
-        bpy.context.window.view_layer = bpy.context.scene.view_layers['BG']
-        for elm in elements:
-            for elmg in elementsGeo:
-                bpy.context.view_layer.layer_collection.children[elm.name].children[elmg.name].exclude = True
-                
-        for bg in bgs:
-            for bgg in bgGeo:
-                bpy.context.view_layer.layer_collection.children[bg.name].children[bgg.name].exclude = False
-
-        for cano in canos:
-            for canog in canosGeo:
-                bpy.context.view_layer.layer_collection.children[cano.name].children[canog.name].exclude = False
-            
-        for shd in shadow:
-            for bg in bgs:
-                bpy.context.view_layer.layer_collection.children[bg.name].children[shd.name].exclude = True
-
-
-        # set cano vis
-        # Elements = Hidden
-        # bg.bg.Geo = Visible - holdback = On
-        # bg.bg.Shd = Hidden
-        # cano = Visible
-        # fog = Hidden
-        bpy.context.window.v        
-        bpy.context.window.view_layer = bpy.context.scene.view_layers['Kiwicano']
-        for elm in elements:
-            for elmg in elementsGeo:
-                bpy.context.view_layer.layer_collection.children[elm.name].children[elmg.name].exclude = True
-                
-        for bg in bgs:
-            set_collections_and_children_holdout([bg.name], holdout_value=True)
-            for bgg in bgGeo:
-                bpy.context.view_layer.layer_collection.children[bg.name].children[bgg.name].exclude = False
-                bpy.context.view_layer.layer_collection.children[bg.name].children['Fog'].exclude = True
-                bpy.context.view_layer.layer_collection.children[bg.name].exclude = False
-                
-
-        for cano in canos:
-            for canog in canosGeo:
-                bpy.context.view_layer.layer_collection.children[cano.name].children[canog.name].exclude = False
-            
-        for shd in shadow:
-            for bg in bgs:
-                bpy.context.view_layer.layer_collection.children[bg.name].children[shd.name].exclude = True
-
-
-                
+        start = time.perf_counter()
+        changes = apply_visibility_matrix(context.scene, dry_run=self.dry_run)
+        for layer, path, prop, old, new in changes:
+            print(f"{layer}: {path} {prop} {old} -> {new}")
+        verb = "Would change" if self.dry_run else "Changed"
+        self.report({'INFO'}, f"{verb} {len(changes)} visibility settings in {time.perf_counter() - start:.3f}s")
         return {'FINISHED'}
-            
-
-        # set file output
-
-        # split filepath by '\'
-        filepath = bpy.data.filepath.split('\\')
-
-
-        # check to see if there are 9 elements in the file path (drive, showcode, wip/checkin/publish, Season, Episode, Sequence, Shot Code, Step, Task, Full Name
-        if len(filepath) == (11):
-            print("true")
-        else:
-            print("false")
-            raise Exception ("File not saved in system. Save file in appropriate task and try again.")
-
-        # set filepath split into variables    
-        a,b,c,d,e,f,g,h,i,j,k = filepath
 
-        # split file name (filepath.k)
-        filename = k.split(".")
-        fn, fe = filename
 
-        print(fn)
-
-        # set render file path output.
-        bpy.context.scene.render.filepath = a+"\\"+b+"\\"+c+"\\"+d+"\\"+e+"\\"+f+"\\"+g+"\\"+h+"\\"+i+"\\"+j+"\\" +"Render\\"+fn+"_####.exr"
-
-        return {'FINISHED'}
-    
-    
+# lighting rigs
+# Rig name -> library .blend. The rig's worlds, objects and node groups are linked;
+# the scene gets the rig's objects and its (last) world.
+LIGHT_RIGS = {
+    "Day": r"X:\KWI\KIWI_AssetLibrary\SetProps\Materials\WorldLighting_Day.blend",
+    "Dusk": r"X:\KWI\KIWI_AssetLibrary\SetProps\Materials\WorldLighting_Dusk.blend",
+    "Night": r"X:\KWI\KIWI_AssetLibrary\SetProps\Materials\WorldLighting_Night.blend",
+}
+LIGHT_RIG_DATA = ("worlds", "objects", "node_groups")
+
+_library_contents = {} # library path -> (mtime_ns, {data type: [names]})
+
+def library_contents(path, data_types=LIGHT_RIG_DATA):
+    """Datablock names in a library per data type. The library is only read again when its mtime changes."""
+    mtime_ns = os.stat(path).st_mtime_ns
+    cached = _library_contents.get(path)
+    if cached and cached[0] == mtime_ns and all(attr in cached[1] for attr in data_types):
+        return cached[1]
+    with bpy.data.libraries.load(path, link=True) as (data_from, data_to):
+        contents = {attr: list(getattr(data_from, attr)) for attr in data_types}
+    _library_contents[path] = (mtime_ns, contents)
+    return contents
+
+def find_library(path):
+    path = os.path.normcase(os.path.abspath(path))
+    for library in bpy.data.libraries:
+        if os.path.normcase(os.path.abspath(bpy.path.abspath(library.filepath))) == path:
+            return library
+    return None
+
+def link_missing(path, data_types=LIGHT_RIG_DATA):
+    """Link every datablock of the library that isn't linked yet.
+
+    Returns ({data type: [linked datablocks]}, number newly linked). Nothing is read from
+    the library when everything is already linked and the file hasn't changed.
+    """
+    contents = library_contents(path, data_types)
+    library = find_library(path)
+    linked_names = {attr: set() for attr in data_types}
+    if library is not None:
+        for attr in data_types:
+            linked_names[attr] = {block.name for block in getattr(bpy.data, attr) if block.library == library}
+    missing = {attr: [name for name in contents[attr] if name not in linked_names[attr]] for attr in data_types}
+    count = sum(len(names) for names in missing.values())
+    if count:
+        with bpy.data.libraries.load(path, link=True) as (data_from, data_to):
+            for attr, names in missing.items():
+                setattr(data_to, attr, names)
+        library = find_library(path)
+    if library is None:
+        return {attr: [] for attr in data_types}, count
+    linked = {attr: [block for block in getattr(bpy.data, attr) if block.library == library] for attr in data_types}
+    return linked, count
 
 class ImportLightAssets(bpy.types.Operator):
     """Imports all assets for lighting"""
     bl_idname = "render.import_light_assets"
     bl_label = "Import Lighting Assets"
     bl_options = {'REGISTER', 'UNDO'}
+
+    rig: bpy.props.EnumProperty(name="Rig", items=[(name, name, f"Link the {name} lighting rig") for name in LIGHT_RIGS])
     
     def execute(self, context):
-        blend_file_path = "X:\KWI\KIWI_AssetLibrary\SetProps\Materials\WorldLighting_Day.blend"
-
-        with bpy.data.libraries.load(blend_file_path, link=True) as (data_from, data_to):
-            data_to.worlds = data_from.worlds
-            data_to.objects = data_from.objects
+        blend_file_path = LIGHT_RIGS[self.rig]
+        start = time.perf_counter()
+        try:
+            linked, new_links = link_missing(blend_file_path)
+        except OSError as e:
+            self.report({'ERROR'}, f"Can't read lighting rig {blend_file_path}: {e}")
+            return {'CANCELLED'}
             
-        scene = bpy.context.scene
+        scene = context.scene
+
+        added = 0
+        for obj in linked["objects"]:
+            if scene not in obj.users_scene:
+                scene.collection.objects.link(obj)
+                added += 1
+
+        worlds = linked["worlds"]
+        if worlds and scene.world not in worlds:
+            world_names = _library_contents[blend_file_path][1]["worlds"]
+            by_name = {wor.name: wor for wor in worlds}
+            scene.world = by_name.get(world_names[-1], worlds[-1])
+
+        self.report({'INFO'}, f"{self.rig} rig: {new_links} datablocks linked, {added} objects added to the scene "
+                              f"in {time.perf_counter() - start:.3f}s")
+        return {'FINISHED'}
 
-        for obj in data_to.objects:
-            if obj is None:
-                continue
-            
-            scene.collection.objects.link(obj)
-            
-        for wor in data_to.worlds:
-            if wor is None:
-                continue
-            
-            scene.world = wor
+
+
+# output format benchmark
+# Saves one sample frame in each profile and times it, to weigh farm I/O against storage.
+# The sample is the last render when there is one, otherwise a synthetic frame.
+#   blender -b --factory-startup -P Render-RenderSetup.py -- benchmark-formats [--size 1920 1080]
+#       [--profiles exr_dwaa_half png8 ...] [--keep folder] [--csv report.csv]
+def _benchmark_frame(width, height):
+    """Float test image with gradients, detail and grain, so compression has something render-like to chew on."""
+    image = bpy.data.images.new("FormatBenchmark", width, height, alpha=True, float_buffer=True)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    pixels = np.empty((height, width, 4), np.float32)
+    pixels[..., 0] = x / width
+    pixels[..., 1] = y / height
+    pixels[..., 2] = 0.5 + 0.5 * np.sin(x / 37.0) * np.cos(y / 23.0)
+    pixels[..., :3] += np.random.default_rng(0).normal(0.0, 0.02, (height, width, 3))
+    pixels[..., 3] = 1.0
+    image.pixels.foreach_set(pixels.ravel())
+    return image
+
+def benchmark_output_formats(profiles=None, image=None, size=(1920, 1080), folder=None):
+    """Save image (or a synthetic frame of size) in each profile. Returns [(profile, seconds, bytes)]."""
+    profiles = profiles or list(OUTPUT_FORMATS)
+    sample = image or _benchmark_frame(*size)
+    # a scratch scene carries the format so the user's render settings stay untouched
+    scene = bpy.data.scenes.new("FormatBenchmark")
+    out_dir = folder or tempfile.mkdtemp(prefix="format_benchmark_")
+    results = []
+    try:
+        for profile in profiles:
+            apply_output_format(scene.render.image_settings, profile)
+            filepath = os.path.join(out_dir, f"{profile}.{'exr' if OUTPUT_FORMATS[profile]['file_format'] == 'OPEN_EXR' else 'png'}")
+            start = time.perf_counter()
+            sample.save_render(filepath, scene=scene)
+            results.append((profile, time.perf_counter() - start, os.path.getsize(filepath)))
+    finally:
+        bpy.data.scenes.remove(scene)
+        if image is None:
+            bpy.data.images.remove(sample)
+        if folder is None:
+            shutil.rmtree(out_dir, ignore_errors=True)
+    return results
+
+def print_benchmark(results):
+    print(f"{'Profile':<16} {'Encode':>9} {'Size':>10}")
+    for profile, seconds, size in sorted(results, key=lambda r: r[2]):
+        print(f"{profile:<16} {seconds * 1000:>7.0f}ms {size / 1048576:>8.2f}MB")
+
+class BenchmarkOutputFormats(bpy.types.Operator):
+    """Saves a sample frame in every output format profile and prints encode time and file size"""
+    bl_idname = "render.benchmark_output_formats"
+    bl_label = "Benchmark Output Formats"
+
+    def execute(self, context):
+        render_result = bpy.data.images.get("Render Result")
+        image = render_result if render_result and render_result.has_data else None
+        width = context.scene.render.resolution_x * context.scene.render.resolution_percentage // 100
+        height = context.scene.render.resolution_y * context.scene.render.resolution_percentage // 100
+        results = benchmark_output_formats(image=image, size=(width, height))
+        print_benchmark(results)
+        smallest = min(results, key=lambda r: r[2])
+        fastest = min(results, key=lambda r: r[1])
+        self.report({'INFO'}, f"Smallest: {smallest[0]} ({smallest[2] / 1048576:.2f} MB), "
+                              f"fastest: {fastest[0]} ({fastest[1] * 1000:.0f} ms), details in the console")
+        return {'FINISHED'}
+
+
+
+# render pass profiles
+# Every pass flag a profile controls, with the EXR channels it adds. A profile turns on
+# the flags it lists and turns off all the others. Cryptomatte channels depend on the
+# layer's pass_cryptomatte_depth (4 channels per 2 levels), see pass_channel_count().
+PASS_CHANNELS = {
+    "use_pass_combined": 4,
+    "use_pass_z": 1,
+    "use_pass_mist": 1,
+    "use_pass_position": 3,
+    "use_pass_normal": 3,
+    "use_pass_vector": 4,
+    "use_pass_uv": 3,
+    "cycles.denoising_store_passes": 7, # Denoising Normal, Albedo and Depth
+    "use_pass_object_index": 1,
+    "use_pass_material_index": 1,
+    "use_pass_diffuse_direct": 3,
+    "use_pass_diffuse_indirect": 3,
+    "use_pass_diffuse_color": 3,
+    "use_pass_glossy_direct": 3,
+    "use_pass_glossy_indirect": 3,
+    "use_pass_glossy_color": 3,
+    "use_pass_transmission_direct": 3,
+    "use_pass_transmission_indirect": 3,
+    "use_pass_transmission_color": 3,
+    "use_pass_emit": 3,
+    "use_pass_environment": 3,
+    "use_pass_ambient_occlusion": 3,
+    "use_pass_cryptomatte_object": None,
+    "use_pass_cryptomatte_material": None,
+    "use_pass_cryptomatte_asset": None,
+}
+PASS_PROFILES = {
+    "beauty": ["use_pass_combined"],
+    "lighting": [
+        "use_pass_combined",
+        "use_pass_diffuse_direct", "use_pass_diffuse_indirect", "use_pass_diffuse_color",
+        "use_pass_glossy_direct", "use_pass_glossy_indirect", "use_pass_glossy_color",
+        "use_pass_transmission_direct", "use_pass_transmission_indirect", "use_pass_transmission_color",
+        "use_pass_emit", "use_pass_environment", "use_pass_ambient_occlusion",
+    ],
+    "utility": [
+        "use_pass_combined", "use_pass_z", "use_pass_mist", "use_pass_position", "use_pass_normal",
+        "use_pass_vector", "use_pass_uv", "use_pass_object_index", "use_pass_material_index",
+        "use_pass_cryptomatte_object", "use_pass_cryptomatte_material", "use_pass_cryptomatte_asset",
+    ],
+}
+# Other view layer settings written with every profile
+PASS_LAYER_SETTINGS = {"pass_alpha_threshold": 0.5}
+# Profile per render layer
+LAYER_PASS_PROFILES = {layer: "beauty" for layer in layer_name}
+
+def _pass_owner(view_layer, flag):
+    """(struct, property) for a pass flag, e.g. 'cycles.denoising_store_passes' -> (view_layer.cycles, 'denoising_store_passes')."""
+    owner_path, prop = _split_rna_path(flag)
+    return (getattr(view_layer, owner_path) if owner_path else view_layer), prop
+
+def apply_pass_profile(view_layer, profile):
+    """Set all pass flags of a view layer for a profile, writing only the ones that differ. Returns the count."""
+    enabled = set(PASS_PROFILES[profile])
+    wanted = {flag: flag in enabled for flag in PASS_CHANNELS}
+    wanted.update(PASS_LAYER_SETTINGS)
+    changed = 0
+    for flag, value in wanted.items():
+        owner, prop = _pass_owner(view_layer, flag)
+        if not _same_value(getattr(owner, prop), value):
+            setattr(owner, prop, value)
+            changed += 1
+    return changed
+
+def pass_channel_count(view_layer):
+    """EXR channels a view layer writes, and the enabled pass flags."""
+    channels = 0
+    enabled = []
+    for flag, count in PASS_CHANNELS.items():
+        owner, prop = _pass_owner(view_layer, flag)
+        if getattr(owner, prop):
+            enabled.append(flag)
+            channels += count if count is not None else (view_layer.pass_cryptomatte_depth + 1) // 2 * 4
+    return channels, enabled
+
+def print_pass_report(scene):
+    """Print channels per rendered view layer and the uncompressed multilayer EXR size of one frame."""
+    render = scene.render
+    pixels = (render.resolution_x * render.resolution_percentage // 100) * (render.resolution_y * render.resolution_percentage // 100)
+    bytes_per_channel = 4 if render.image_settings.color_depth == '32' else 2
+    total = 0
+    for view_layer in scene.view_layers:
+        if not view_layer.use:
+            continue
+        channels, enabled = pass_channel_count(view_layer)
+        total += channels
+        print(f"{view_layer.name}: {channels} channels ({', '.join(flag.split('.')[-1].replace('use_pass_', '') for flag in enabled)})")
+    size = total * pixels * bytes_per_channel
+    print(f"EXR per frame: {total} channels, ~{size / 1048576:.1f} MB uncompressed at {bytes_per_channel * 8} bit")
+    return total, size
+
+class PassReport(bpy.types.Operator):
+    """Prints the EXR channels per view layer and the estimated size of one frame"""
+    bl_idname = "render.pass_report"
+    bl_label = "Estimate EXR Size"
+
+    def execute(self, context):
+        channels, size = print_pass_report(context.scene)
+        self.report({'INFO'}, f"{channels} EXR channels, ~{size / 1048576:.1f} MB per frame uncompressed (details in the console)")
         return {'FINISHED'}
 
 
@@ -267,186 +621,193 @@ class SetRenderSettings(bpy.types.Operator):
     bl_options = {'REGISTER', 'UNDO'}
     
     
+    preset: bpy.props.StringProperty(name="Preset", default="cycles_final", description="Render preset to apply")
+    all_scenes: bpy.props.BoolProperty(name="All Scenes", default=False, description="Apply the preset to every scene in the file")
+    output_format: bpy.props.EnumProperty(name="Output Format", default="KEEP",
+                                          items=[("KEEP", "Keep Current", "Leave the render output's depth and codec as they are")]
+                                                + [(name, name, "") for name in OUTPUT_FORMATS],
+                                          description="Image format profile for the render output (EXR profiles write multilayer EXR)")
+
     def execute(self, context):
-        # set "ViewLayer" to not render
-        bpy.data.scenes["Scene"].view_layers["ViewLayer"].use = False
-        
         # set render layer AOV's
-        for layer in layer_name:
-            bpy.data.scenes["Scene"].view_layers[layer].use_pass_combined = True
-            bpy.data.scenes["Scene"].view_layers[layer].use_pass_z = False
-            bpy.data.scenes["Scene"].view_layers[layer].use_pass_mist
-            bpy.data.scenes["Scene"].view_layers[layer].use_pass_position
-            bpy.data.scenes["Scene"].view_layers[layer].use_pass_normal
-            bpy.data.scenes["Scene"].view_layers[layer].use_pass_vector
-            bpy.data.scenes["Scene"].view_layers[layer].use_pass_uv
-            bpy.data.scenes["Scene"].view_layers[layer].cycles.denoising_store_passes = False
-            bpy.data.scenes["Scene"].view_layers[layer].use_pass_object_index = False
-            bpy.data.scenes["Scene"].view_layers[layer].use_pass_material_index = False
-            bpy.data.scenes["Scene"].view_layers[layer].pass_alpha_threshold = 0.5
-            bpy.data.scenes["Scene"].view_layers[layer].use_pass_diffuse_direct
-            bpy.data.scenes["Scene"].view_layers[layer].use_pass_diffuse_indirect
-            bpy.data.scenes["Scene"].view_layers[layer].use_pass_diffuse_color
-            bpy.data.scenes["Scene"].view_layers[layer].use_pass_glossy_direct
-            bpy.data.scenes["Scene"].view_layers[layer].use_pass_glossy_indirect
-            bpy.data.scenes["Scene"].view_layers[layer].use_pass_glossy_color
-            bpy.data.scenes["Scene"].view_layers[layer].use_pass_transmission_direct
-            bpy.data.scenes["Scene"].view_layers[layer].use_pass_transmission_indirect
-            bpy.data.scenes["Scene"].view_layers[layer].use_pass_transmission_color
-            bpy.data.scenes["Scene"].view_layers[layer].use_pass_emit
-            bpy.data.scenes["Scene"].view_layers[layer].use_pass_environment
-            bpy.data.scenes["Scene"].view_layers[layer].use_pass_ambient_occlusion
-            bpy.data.scenes["Scene"].view_layers[layer].use_pass_ambient_occlusion
-            bpy.data.scenes["Scene"].view_layers[layer].use_pass_cryptomatte_object
-            bpy.data.scenes["Scene"].view_layers[layer].use_pass_cryptomatte_material
-            bpy.data.scenes["Scene"].view_layers[layer].use_pass_cryptomatte_asset
-        
-        
-
-
-
-
-
+        for layer, profile in LAYER_PASS_PROFILES.items():
+            view_layer = context.scene.view_layers.get(layer)
+            if view_layer is None:
+                print(f"View layer '{layer}' not found, pass profile skipped.")
+                continue
+            changed = apply_pass_profile(view_layer, profile)
+            print(f"{layer}: pass profile '{profile}', {changed} settings changed")
 
-    
         # render settings
-        bpy.context.scene.cycles.preview_samples = 0
-        bpy.context.scene.render.engine = 'CYCLES'
-        bpy.context.scene.cycles.feature_set = 'SUPPORTED'
-        bpy.context.scene.cycles.device = 'GPU'
-        bpy.context.scene.cycles.use_adaptive_sampling = True
-        bpy.context.scene.cycles.adaptive_threshold = 0.01
-        bpy.context.scene.cycles.samples = 64
-        bpy.context.scene.cycles.adaptive_min_samples = 0
-        bpy.context.scene.cycles.time_limit = 0
-        bpy.context.scene.cycles.use_denoising = True
-        bpy.context.scene.cycles.denoiser = 'OPTIX'
-        bpy.context.scene.cycles.denoising_input_passes = 'RGB_ALBEDO_NORMAL'
-        bpy.context.scene.cycles.use_light_tree = True
-        bpy.context.scene.cycles.sampling_pattern = 'AUTOMATIC'
-        bpy.context.scene.cycles.seed = 0
-        bpy.context.scene.cycles.sample_offset = 0
-        bpy.context.scene.cycles.min_light_bounces = 0
-        bpy.context.scene.cycles.min_transparent_bounces = 0
-        bpy.context.scene.cycles.max_bounces = 12
-        bpy.context.scene.cycles.diffuse_bounces = 4
-        bpy.context.scene.cycles.glossy_bounces = 4
-        bpy.context.scene.cycles.transmission_bounces = 12
-        bpy.context.scene.cycles.volume_bounces = 0
-        bpy.context.scene.cycles.transparent_max_bounces = 8
-        bpy.context.scene.cycles.sample_clamp_direct = 0
-        bpy.context.scene.cycles.sample_clamp_indirect = 10
-        bpy.context.scene.cycles.blur_glossy = 1
-        bpy.context.scene.cycles.caustics_refractive = False
-        bpy.context.scene.cycles.caustics_reflective = False
-        bpy.context.scene.cycles.use_fast_gi = False
-        bpy.context.scene.cycles.volume_step_rate = 1
-        bpy.context.scene.cycles.volume_preview_step_rate = 1
-        bpy.context.scene.cycles.volume_max_steps = 4096
-        bpy.context.scene.cycles_curves.shape = 'RIBBONS'        
-        bpy.context.scene.cycles_curves.subdivisions = 2
-        bpy.context.scene.render.hair_type = 'STRAND'
-        bpy.context.scene.render.hair_subdiv = 0
-        bpy.context.scene.render.use_simplify = False
-        bpy.context.scene.render.simplify_subdivision = 1
-        bpy.context.scene.render.simplify_child_particles = 1
-        bpy.context.scene.cycles.texture_limit = '512'
-        bpy.context.scene.render.simplify_volumes = 1
-        bpy.context.scene.render.use_simplify_normals = False
-        bpy.context.scene.render.simplify_subdivision_render = 4
-        bpy.context.scene.render.simplify_child_particles_render = 1
-        bpy.context.scene.cycles.texture_limit_render = '4096'
-        bpy.context.scene.cycles.use_camera_cull = False
-        bpy.context.scene.cycles.use_distance_cull = False
-        bpy.context.scene.render.use_motion_blur = False
-        bpy.context.scene.cycles.film_exposure = 1
-        bpy.context.scene.cycles.pixel_filter_type = 'BLACKMAN_HARRIS'
-        bpy.context.scene.render.film_transparent = True
-        bpy.context.scene.cycles.film_transparent_glass = False
-        bpy.context.scene.render.compositor_device = 'GPU'
-        bpy.context.scene.render.compositor_precision = 'FULL'
-        bpy.context.scene.render.threads_mode = 'AUTO'
-        bpy.context.scene.cycles.use_auto_tile = True
-        bpy.context.scene.cycles.tile_size = 32
-        bpy.context.scene.render.use_persistent_data = True
-        bpy.context.scene.render.preview_pixel_size = '4'
-        bpy.context.scene.display_settings.display_device = 'sRGB'
-        bpy.context.scene.view_settings.view_transform = 'Standard'
-        bpy.context.scene.view_settings.look = 'None'
-        bpy.context.scene.view_settings.exposure = 0
-        bpy.context.scene.view_settings.gamma = 1
-        bpy.context.scene.sequencer_colorspace_settings.name = 'sRGB'
-        bpy.context.scene.render.use_sequencer = False
-        bpy.context.scene.render.image_settings.file_format = 'OPEN_EXR_MULTILAYER'
-        bpy.context.scene.render.use_overwrite = True
-        bpy.context.scene.render.use_placeholder = False
-
-        
-                # set file output
-
-        # split filepath by '\'
-        filepath = bpy.data.filepath.split('\\')
-
-
-        # check to see if there are 9 elements in the file path (drive, showcode, wip/checkin/publish, Season, Episode, Sequence, Shot Code, Step, Task, Full Name
-        if len(filepath) == (11):
-            print("true")
-        else:
-            print("false")
-            raise Exception ("File not saved in system. Save file in appropriate task and try again.")
-
-        # set filepath split into variables    
-        a,b,c,d,e,f,g,h,i,j,k = filepath
+        presets = load_render_presets(RENDER_PRESETS)
+        if self.preset not in presets:
+            self.report({'ERROR'}, f"Render preset '{self.preset}' not found")
+            return {'CANCELLED'}
+        compiled = compile_render_preset(presets[self.preset])
+        scenes = bpy.data.scenes if self.all_scenes else [context.scene]
+        for scene in scenes:
+            changes, skipped, seconds = apply_render_preset(scene, compiled)
+            for path, old, new in changes:
+                print(f"{scene.name}: {path} {old!r} -> {new!r}")
+            for path, reason in skipped:
+                print(f"{scene.name}: skipped {path}: {reason}")
+            self.report({'INFO'}, f"{scene.name}: preset '{self.preset}' changed {len(changes)} settings "
+                                  f"({len(skipped)} skipped) in {seconds * 1000:.1f} ms")
+            if self.output_format != "KEEP":
+                apply_output_format(scene.render.image_settings, self.output_format, multilayer=True)
+        print_pass_report(context.scene)
 
-        # split file name (filepath.k)
-        filename = k.split(".")
-        fn, fe = filename
 
-        print(fn)
-
-        # set render file path output.
-        bpy.context.scene.render.filepath = a+"\\"+b+"\\"+c+"\\"+d+"\\"+e+"\\"+f+"\\"+g+"\\"+h+"\\"+i+"\\"+j+"\\" +"Render\\"+fn+".png"
+        # set file output
+        try:
+            context.scene.render.filepath = output_path("render")
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        print(context.scene.render.filepath)
 
-    
         return{'FINISHED'}
     
     
  
-# recursive hold out script    
-def set_collections_and_children_holdout(collection_names, holdout_value=True):
-    """
-#    Sets the holdout property for a list of collections and all their children
-#    in the current view layer.
-#    Args:
-#        collection_names (list of str): A list of collection names to target.
-#        holdout_value (bool): The holdout value to set (True or False). Defaults to True.
-    """
-    def set_holdout_recursive(collection, layer_collection, value):
-        """Recursive function to set holdout for a collection and its children."""
-        layer_col = layer_collection.children.get(collection.name)
-        if layer_col:
-            layer_col.holdout = value
-            for child in collection.children:
-                set_holdout_recursive(child, layer_col, value)
-    view_layer = bpy.context.view_layer
-    master_layer_collection = view_layer.layer_collection
-    for collection_name in collection_names:
-        collection = bpy.data.collections.get(collection_name)
-        if collection:
-            set_holdout_recursive(collection, master_layer_collection, holdout_value)
-            print(f"Set holdout '{holdout_value}' for collection '{collection_name}' and its children.")
+# batch render setup
+# Runs the setup operators on many shot files without the UI, one `blender -b` per file,
+# at most --workers at a time. A failing file is reported and the rest carry on:
+#   blender -b --factory-startup -P Render-RenderSetup.py -- batch-setup shots/*.blend
+#       [--workers 4] [--steps createlayers setassetvis ...] [--no-save] [--timeout 600] [--csv report.csv]
+SETUP_STEPS = ["createlayers", "setassetvis", "set_render_settings", "import_light_assets"]
+SETUP_RESULT_PREFIX = "SETUP_RESULT "
+SETUP_FILE_TIMEOUT = 600 # seconds before a file's Blender is stopped and the file reported as failed
+
+def run_setup_steps(steps, save=True):
+    """Run the render.<step> operators on the open file and save it. Stops at the first failing step."""
+    result = {"file": bpy.data.filepath, "status": "done", "steps": {}, "error": ""}
+    for step in steps:
+        start = time.perf_counter()
+        try:
+            outcome = getattr(bpy.ops.render, step)()
+            if 'FINISHED' not in outcome:
+                raise RuntimeError(f"operator returned {set(outcome)}")
+        except Exception as e:
+            result["steps"][step] = round(time.perf_counter() - start, 3)
+            result.update(status="failed", error=f"{step}: {e}")
+            return result # a half set up file isn't saved
+        result["steps"][step] = round(time.perf_counter() - start, 3)
+    if save:
+        start = time.perf_counter()
+        bpy.ops.wm.save_mainfile()
+        result["steps"]["save"] = round(time.perf_counter() - start, 3)
+    return result
+
+def _setup_one_file(blend_path, steps, save, timeout):
+    cmd = [bpy.app.binary_path, "-b", "--factory-startup", blend_path, "--python-exit-code", "1",
+           "-P", os.path.abspath(__file__), "--", "setup-file", "--steps", *steps]
+    if not save:
+        cmd.append("--no-save")
+    start = time.perf_counter()
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        result = None
+        for line in proc.stdout.splitlines():
+            if line.startswith(SETUP_RESULT_PREFIX):
+                result = json.loads(line[len(SETUP_RESULT_PREFIX):])
+        if result is None:
+            stderr_tail = proc.stderr.strip().splitlines()[-1:] or [""]
+            result = {"status": "failed", "steps": {}, "error": f"Blender exited {proc.returncode}: {stderr_tail[0]}"}
+    except subprocess.TimeoutExpired:
+        result = {"status": "failed", "steps": {}, "error": f"timed out after {timeout}s"}
+    result["file"] = blend_path
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+def _expand_blend_paths(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in sorted(names) if name.endswith(".blend"))
         else:
-            print(f"Collection '{collection_name}' not found.")
-
-
+            files.append(path)
+    return [os.path.abspath(f) for f in files]
+
+def run_batch_setup(args):
+    files = _expand_blend_paths(args.files)
+    print(f"Batch render setup: {len(files)} files, steps {', '.join(args.steps)}, {args.workers} workers")
+    start = time.perf_counter()
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        jobs = [pool.submit(_setup_one_file, f, args.steps, not args.no_save, args.timeout) for f in files]
+        for n, job in enumerate(jobs, 1):
+            result = job.result()
+            results.append(result)
+            print(f"[{n}/{len(files)}] {os.path.basename(result['file'])}: {result['status']} "
+                  f"({result['seconds']:.1f}s) {result['error']}")
+
+    columns = args.steps + ([] if args.no_save else ["save"])
+    print(f"{'File':<40} {'Status':<7} " + " ".join(f"{c[:12]:>12}" for c in columns) + f" {'Total':>8}")
+    for r in results:
+        print(f"{os.path.basename(r['file']):<40} {r['status']:<7} "
+              + " ".join(f"{r['steps'][c]:>12.2f}" if c in r["steps"] else f"{'-':>12}" for c in columns)
+              + f" {r['seconds']:>8.1f}")
+    failed = sum(1 for r in results if r["status"] != "done")
+    print(f"Batch render setup finished: {len(results) - failed} done, {failed} failed in {time.perf_counter() - start:.1f}s")
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["file", "status"] + columns + ["total_seconds", "error"])
+            for r in results:
+                writer.writerow([r["file"], r["status"]] + [r["steps"].get(c, "") for c in columns] + [r["seconds"], r["error"]])
+    return 1 if failed else 0
+
+def batch_main(argv):
+    parser = argparse.ArgumentParser(prog="Render-RenderSetup.py", description="Run the render setup on many shot files.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser("batch-setup", help="Set up many .blend files in background Blender processes")
+    batch.add_argument("files", nargs="+", help=".blend files or folders to search for them")
+    batch.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    batch.add_argument("--steps", nargs="+", default=SETUP_STEPS, choices=SETUP_STEPS)
+    batch.add_argument("--no-save", action="store_true", help="Run the steps without saving the files")
+    batch.add_argument("--timeout", type=float, default=SETUP_FILE_TIMEOUT, help="Seconds before a file's Blender is stopped and the file failed")
+    batch.add_argument("--csv", help="Also write the per-step timings to this CSV file")
+
+    one = commands.add_parser("setup-file", help="Internal: run the steps on the file Blender opened")
+    one.add_argument("--steps", nargs="+", default=SETUP_STEPS, choices=SETUP_STEPS)
+    one.add_argument("--no-save", action="store_true")
+
+    bench = commands.add_parser("benchmark-formats", help="Time saving a sample frame in each output format profile")
+    bench.add_argument("--profiles", nargs="+", default=list(OUTPUT_FORMATS), choices=list(OUTPUT_FORMATS))
+    bench.add_argument("--size", nargs=2, type=int, default=[1920, 1080], metavar=("WIDTH", "HEIGHT"))
+    bench.add_argument("--keep", metavar="FOLDER", help="Write the sample files here and keep them")
+    bench.add_argument("--csv", help="Also write the results to this CSV file")
+
+    args = parser.parse_args(argv)
+    if args.command == "batch-setup":
+        return run_batch_setup(args)
+    if args.command == "benchmark-formats":
+        if args.keep:
+            os.makedirs(args.keep, exist_ok=True)
+        results = benchmark_output_formats(args.profiles, size=tuple(args.size), folder=args.keep)
+        print_benchmark(results)
+        if args.csv:
+            with open(args.csv, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(["profile", "encode_seconds", "bytes"])
+                writer.writerows((profile, round(seconds, 4), size) for profile, seconds, size in results)
+        return 0
+    register()
+    print(SETUP_RESULT_PREFIX + json.dumps(run_setup_steps(args.steps, save=not args.no_save)), flush=True)
+    return 0
 
-        
 def register():
     bpy.utils.register_class(VIEW3D_PT_my_custom_panel)
     bpy.utils.register_class(SetRenderSettings)
     bpy.utils.register_class(create_render_layers)
     bpy.utils.register_class(setAssetVis)
     bpy.utils.register_class(ImportLightAssets)
+    bpy.utils.register_class(PassReport)
+    bpy.utils.register_class(BenchmarkOutputFormats)
 
 def unregister():
     bpy.utils.unregister_class(VIEW3D_PT_my_custom_panel)
@@ -454,7 +815,12 @@ def unregister():
     bpy.utils.unregister_class(create_render_layers)
     bpy.utils.unregister_class(setAssetVis)
     bpy.utils.unregister_class(ImportLightAssets)
+    bpy.utils.unregister_class(PassReport)
+    bpy.utils.unregister_class(BenchmarkOutputFormats)
 
 
 if __name__ == "__main__":
+    # command line batch: blender -b -P Render-RenderSetup.py -- batch-setup ...
+    if bpy.app.background and "--" in sys.argv:
+        sys.exit(batch_main(sys.argv[sys.argv.index("--") + 1:]))
     register()
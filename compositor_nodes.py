@@ -0,0 +1,78 @@
+"""
+Compositor node tree index, shared by the compositor scripts.
+
+Lookups into a compositor tree without scanning tree.nodes / tree.links each time. Build it
+once per tree, then add nodes and links through it so its maps stay current.
+
+Not an add-on: the scripts next to it put their own folder on sys.path and import it.
+"""
+GROUP_NODE_TYPES = ('GROUP', 'NODE_GROUP')
+
+
+class NodeTreeIndex:
+    """Nodes of a tree by type, name and group definition name, and links by the nodes they connect."""
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.by_type = {}   # node.type -> [nodes]
+        self.by_name = {}   # node.name -> node
+        self.by_group = {}  # node.node_tree.name -> [group nodes]
+        self.by_pair = {}   # (from node name, to node name) -> {to socket identifier: link}
+        self.by_input = {}  # to node name -> {to socket identifier: link}
+        for node in tree.nodes:
+            self._add_node(node)
+        for link in tree.links:
+            self._add_link(link)
+
+    def _add_node(self, node):
+        self.by_type.setdefault(node.type, []).append(node)
+        self.by_name[node.name] = node
+        if node.type in GROUP_NODE_TYPES and node.node_tree:
+            self.by_group.setdefault(node.node_tree.name, []).append(node)
+
+    def _add_link(self, link):
+        self.by_pair.setdefault((link.from_node.name, link.to_node.name), {})[link.to_socket.identifier] = link
+        self.by_input.setdefault(link.to_node.name, {})[link.to_socket.identifier] = link
+
+    def _drop_link(self, link):
+        self.by_pair.get((link.from_node.name, link.to_node.name), {}).pop(link.to_socket.identifier, None)
+        self.by_input.get(link.to_node.name, {}).pop(link.to_socket.identifier, None)
+
+    def of_type(self, node_type):
+        return self.by_type.get(node_type, [])
+
+    def node(self, name):
+        return self.by_name.get(name)
+
+    def group_nodes(self, group_name):
+        return self.by_group.get(group_name, [])
+
+    def links_between(self, from_node, to_node):
+        return list(self.by_pair.get((from_node.name, to_node.name), {}).values())
+
+    def link_into(self, socket):
+        """The link feeding an input socket, or None."""
+        return self.by_input.get(socket.node.name, {}).get(socket.identifier)
+
+    def links_into(self, node):
+        return list(self.by_input.get(node.name, {}).values())
+
+    def new_node(self, node_type, name=None):
+        node = self.tree.nodes.new(type=node_type)
+        if name:
+            node.name = name
+        self._add_node(node)
+        return node
+
+    def new_link(self, from_socket, to_socket):
+        # an input takes one link, Blender replaces the one already there
+        old = self.link_into(to_socket)
+        if old is not None:
+            self._drop_link(old)
+        link = self.tree.links.new(from_socket, to_socket)
+        self._add_link(link)
+        return link
+
+    def remove_link(self, link):
+        self._drop_link(link)
+        self.tree.links.remove(link)
@@ -0,0 +1,98 @@
+"""
+Output paths and image formats of the show, shared by the render, compositor and preview scripts.
+
+Not an add-on: the scripts next to it put their own folder on sys.path and import it.
+"""
+import bpy
+import re
+from pathlib import PurePosixPath, PureWindowsPath
+
+# output paths
+# A show file lives at <root>/<show>/<stage>/<shots>/<season>/<episode>/<sequence>/<shot>/<step>/<task>/<file>,
+# <root> being the drive on Windows (X:\) or wherever the show is mounted on Linux render nodes.
+# Outputs are str.format templates over those fields plus task_dir (the folder of the .blend),
+# name (file name without extension), stem (name split on '_', e.g. {stem[0]}) and version
+# (last v### token of name); callers can pass extra fields.
+SHOW_PATH_SCHEMA = ("show", "stage", "shots", "season", "episode", "sequence", "shot", "step", "task", "file")
+OUTPUT_TEMPLATES = {
+    # Render-RenderSetup.py
+    "render": "{task_dir}/Render/{name}.png",
+    # Animation-PreviewTool.py
+    "playblast": "{task_dir}/Playblasts/{name}.mov",
+    # Render-AddCompositorOutputNode.py, next to the render output:
+    # render_parent = folder above it, render_name = its name without _####
+    "compositor_dir": "{render_parent}/{render_name}/",
+    "compositor_slot": "{render_name}.####.png",
+    # Render-CreateNodeTree.py, render_base = render output folder
+    "node_tree_dir": "{render_base}/{stem[0]}_{stem[1]}_{stem[2]}_{stem[3]}_{stem[6]}",
+    "node_tree_slot": "{stem[0]}_{stem[1]}_{stem[2]}_{stem[3]}_{stem[4]}_{stem[5]}_{stem[6]}.####.png",
+    # one folder per view layer and pass: layer = view layer name, pass_name = pass name without spaces
+    "layer_dir": "{render_base}/{stem[0]}_{stem[1]}_{stem[2]}_{stem[3]}_{stem[6]}/{layer}",
+    "layer_slot": "{pass_name}/{stem[0]}_{stem[1]}_{stem[2]}_{stem[3]}_{stem[4]}_{stem[5]}_{stem[6]}_{layer}_{pass_name}.####",
+}
+
+_show_paths = {} # .blend path -> parsed fields
+
+def pure_path(path):
+    # Windows paths (X:\...) keep their meaning on any OS
+    if "\\" in path or PureWindowsPath(path).drive:
+        return PureWindowsPath(path)
+    return PurePosixPath(path)
+
+def parse_show_path(filepath):
+    """Fields of a .blend path, parsed once per path. The schema fields and task_dir are missing when the file isn't saved in the show tree."""
+    fields = _show_paths.get(filepath)
+    if fields is None:
+        fields = {}
+        if filepath:
+            path = pure_path(filepath)
+            if len(path.parts) > len(SHOW_PATH_SCHEMA):
+                fields.update(zip(SHOW_PATH_SCHEMA, path.parts[-len(SHOW_PATH_SCHEMA):]))
+                fields.update(root=path.parents[len(SHOW_PATH_SCHEMA) - 1], task_dir=path.parent)
+            tokens = path.stem.split("_")
+            fields.update(name=path.stem, stem=tokens,
+                          version=next((t for t in reversed(tokens) if re.fullmatch(r"v\d+", t)), ""))
+        _show_paths[filepath] = fields
+    return fields
+
+def output_path(template, filepath=None, **extra):
+    """Fill an OUTPUT_TEMPLATES entry (or a template string) for a .blend, by default the open one."""
+    fields = parse_show_path(bpy.data.filepath if filepath is None else filepath)
+    pattern = OUTPUT_TEMPLATES.get(template, template)
+    try:
+        text = pattern.format(**{**fields, **extra})
+    except KeyError as e:
+        raise ValueError(f"Can't build the '{template}' path, {e} is missing. Save file in appropriate task and try again.") from None
+    except IndexError:
+        raise ValueError(f"Can't build the '{template}' path, the file name has too few '_' parts.") from None
+    path = pure_path(text)
+    sep = "\\" if isinstance(path, PureWindowsPath) else "/"
+    return str(path) + (sep if text.endswith(("/", "\\")) else "")
+
+# output formats
+# Named image format profiles for File Output nodes and the scene render output.
+OUTPUT_FORMATS = {
+    "exr_dwaa_half": {"file_format": 'OPEN_EXR', "exr_codec": 'DWAA', "color_depth": '16', "color_mode": 'RGBA'},
+    "exr_dwaa_full": {"file_format": 'OPEN_EXR', "exr_codec": 'DWAA', "color_depth": '32', "color_mode": 'RGBA'},
+    "exr_zip_half": {"file_format": 'OPEN_EXR', "exr_codec": 'ZIP', "color_depth": '16', "color_mode": 'RGBA'},
+    "exr_zip_full": {"file_format": 'OPEN_EXR', "exr_codec": 'ZIP', "color_depth": '32', "color_mode": 'RGBA'},
+    "exr_piz_half": {"file_format": 'OPEN_EXR', "exr_codec": 'PIZ', "color_depth": '16', "color_mode": 'RGBA'},
+    "exr_piz_full": {"file_format": 'OPEN_EXR', "exr_codec": 'PIZ', "color_depth": '32', "color_mode": 'RGBA'},
+    "exr_none_half": {"file_format": 'OPEN_EXR', "exr_codec": 'NONE', "color_depth": '16', "color_mode": 'RGBA'},
+    "exr_none_full": {"file_format": 'OPEN_EXR', "exr_codec": 'NONE', "color_depth": '32', "color_mode": 'RGBA'},
+    "png8": {"file_format": 'PNG', "color_depth": '8', "color_mode": 'RGBA'},
+    "png16": {"file_format": 'PNG', "color_depth": '16', "color_mode": 'RGBA'},
+}
+
+def apply_output_format(image_settings, profile, multilayer=False):
+    """Write a profile to image format settings (node.format, render.image_settings) where they differ. Returns the number changed."""
+    settings = dict(OUTPUT_FORMATS[profile])
+    if multilayer and settings["file_format"] == 'OPEN_EXR':
+        settings["file_format"] = 'OPEN_EXR_MULTILAYER'
+    changed = 0
+    # file_format goes first, the depth and codec choices depend on it
+    for attr, value in settings.items():
+        if getattr(image_settings, attr) != value:
+            setattr(image_settings, attr, value)
+            changed += 1
+    return changed
@@ -0,0 +1,1046 @@
+"""
+Storage layer shared by the pipeline add-ons (Pipeline-AssetPublishTool.py, Pipeline-ShotManager.py):
+the directory watcher, the per-folder version index, deduplicated version storage, save
+policies with background recompression, and the series catalog.
+
+Not an add-on: the scripts next to it put their own folder on sys.path and import it.
+"""
+import bpy
+import os
+import sys
+import json
+import ctypes
+import ctypes.util
+import select
+import struct
+import contextlib
+import hashlib
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+import threading
+import time
+import numpy
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import zstandard # Not bundled with Blender; the zstd command line tool is used instead if present
+except ImportError:
+    zstandard = None
+
+# --- Directory Watcher ---
+# One watcher serves every add-on that imports this module. Each passes its own client name
+# (its module name): folders are watched while any client wants them, and drain() hands a
+# client only the changes in its own folders.
+# Folders are watched with inotify on local Linux disks. Everywhere else (Windows drives,
+# NFS/SMB mounts, where inotify never sees changes made by other machines) the folder
+# mtime is polled and the folder is only re-listed when it changed.
+WATCH_ENABLED = True
+WATCH_POLL_INTERVAL = 5.0 # Seconds between mtime checks of polled folders
+NETWORK_FS_TYPES = {"nfs", "nfs4", "cifs", "smb3", "smbfs", "fuse.sshfs", "9p", "afs", "ceph", "glusterfs"}
+
+_IN_MOVED_FROM = 0x40
+_IN_MOVED_TO = 0x80
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_DELETE_SELF = 0x400
+_IN_MOVE_SELF = 0x800
+_IN_Q_OVERFLOW = 0x4000
+_IN_IGNORED = 0x8000
+_IN_ONLYDIR = 0x1000000
+_IN_ISDIR = 0x40000000
+_INOTIFY_MASK = _IN_CREATE | _IN_DELETE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_DELETE_SELF | _IN_MOVE_SELF | _IN_ONLYDIR
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+def _load_inotify():
+    """libc with inotify, or None when not on Linux or it can't be loaded."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1, libc.inotify_add_watch, libc.inotify_rm_watch
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+def _is_network_path(path):
+    """True when path is on a network filesystem according to /proc/mounts (Linux only)."""
+    try:
+        with open("/proc/mounts", "r") as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return False
+    path = os.path.realpath(path)
+    best, fstype = "", ""
+    for mount_point, mount_type in mounts:
+        mount_point = mount_point.replace("\\040", " ")
+        if (path == mount_point or path.startswith(mount_point.rstrip("/") + "/")) and len(mount_point) > len(best):
+            best, fstype = mount_point, mount_type
+    return fstype in NETWORK_FS_TYPES
+
+def is_listed_folder(name):
+    # Hidden folders (.dedup store, .git, ...) are left out of every listing and watch event
+    return not name.startswith(".")
+
+def list_subfolders(folder):
+    with os.scandir(folder) as entries:
+        return {e.name for e in entries if e.is_dir() and is_listed_folder(e.name)}
+
+class DirectoryWatcher:
+    """Keeps the subfolder listings of watched folders current and reports what changed.
+
+    watch() takes the listing the caller already has; from then on listing() returns the
+    current names and drain(client) the changes since that client's last call, as (folder, kind, name, new_name)
+    with kind 'ADD', 'REMOVE', 'RENAME' or 'RESCAN' (listing lost, e.g. the folder was removed
+    or the event queue overflowed; the folder is no longer watched).
+    """
+
+    def __init__(self, poll_interval=WATCH_POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._listings = {} # folder -> set of subfolder names
+        self._polled = {} # folder -> mtime_ns the listing was taken at
+        self._wd_folders = {} # inotify watch descriptor -> folder
+        self._folder_wds = {}
+        self._clients = {} # folder -> names of the clients watching it
+        self._events = {} # client -> pending changes
+        self._closed = False
+        self._libc = _load_inotify()
+        self._fd = -1
+        if self._libc is not None:
+            self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        self._thread = threading.Thread(target=self._run, name="directory_watcher", daemon=True)
+        self._thread.start()
+
+    def watch(self, folder, names, client=None):
+        """Start (or restart) watching folder for client, with names as its current subfolder listing."""
+        folder = os.path.abspath(folder)
+        try:
+            mtime_ns = os.stat(folder).st_mtime_ns
+        except OSError:
+            return
+        with self._lock:
+            clients = self._clients.get(folder, set()) | {client}
+            self._drop(folder)
+            self._clients[folder] = clients
+            self._listings[folder] = set(names)
+            wd = -1
+            if self._fd >= 0 and not _is_network_path(folder):
+                wd = self._libc.inotify_add_watch(self._fd, os.fsencode(folder), _INOTIFY_MASK)
+            if wd >= 0:
+                self._wd_folders[wd] = folder
+                self._folder_wds[folder] = wd
+            else:
+                self._polled[folder] = mtime_ns
+
+    def unwatch(self, folder, client=None):
+        """Stop watching folder for client; it stays watched while other clients want it."""
+        folder = os.path.abspath(folder)
+        with self._lock:
+            clients = self._clients.get(folder)
+            if clients is not None:
+                clients.discard(client)
+                if not clients:
+                    self._drop(folder)
+
+    def forget(self, client):
+        """Unwatch every folder of client and drop its pending changes."""
+        with self._lock:
+            for folder, clients in list(self._clients.items()):
+                clients.discard(client)
+                if not clients:
+                    self._drop(folder)
+            self._events.pop(client, None)
+
+    def listing(self, folder):
+        """Current subfolder names of a watched folder (sorted), or None if it isn't watched."""
+        with self._lock:
+            names = self._listings.get(os.path.abspath(folder))
+            return sorted(names) if names is not None else None
+
+    def drain(self, client=None):
+        """Changes in client's folders since its last call, oldest first."""
+        with self._lock:
+            return self._events.pop(client, [])
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            for folder in list(self._listings):
+                self._drop(folder)
+        self._thread.join(timeout=2.0)
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def _drop(self, folder):
+        # Caller holds the lock
+        self._listings.pop(folder, None)
+        self._clients.pop(folder, None)
+        self._polled.pop(folder, None)
+        wd = self._folder_wds.pop(folder, None)
+        if wd is not None:
+            self._wd_folders.pop(wd, None)
+            self._libc.inotify_rm_watch(self._fd, wd)
+
+    def _emit(self, folder, kind, name=None, new_name=None):
+        # Caller holds the lock; applies the change to the listing and queues it
+        names = self._listings.get(folder)
+        if names is None:
+            return
+        if kind == 'ADD':
+            if name in names:
+                return
+            names.add(name)
+        elif kind == 'REMOVE':
+            if name not in names:
+                return
+            names.discard(name)
+        elif kind == 'RENAME':
+            names.discard(name)
+            names.add(new_name)
+        for client in self._clients.get(folder, ()):
+            self._events.setdefault(client, []).append((folder, kind, name, new_name))
+        if kind == 'RESCAN':
+            self._drop(folder)
+
+    def _run(self):
+        next_poll = time.monotonic() + self.poll_interval
+        while not self._closed:
+            timeout = max(0.0, min(1.0, next_poll - time.monotonic()))
+            if self._fd >= 0:
+                ready, _, _ = select.select([self._fd], [], [], timeout)
+                if ready:
+                    self._read_inotify()
+            else:
+                time.sleep(timeout)
+            if time.monotonic() >= next_poll:
+                self._poll()
+                next_poll = time.monotonic() + self.poll_interval
+
+    def _read_inotify(self):
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except (BlockingIOError, OSError):
+            return
+        moved_from = {} # cookie -> (folder, name), paired with the matching IN_MOVED_TO
+        with self._lock:
+            offset = 0
+            while offset < len(data):
+                wd, mask, cookie, length = _INOTIFY_EVENT.unpack_from(data, offset)
+                name = data[offset + _INOTIFY_EVENT.size:offset + _INOTIFY_EVENT.size + length].rstrip(b"\0")
+                name = os.fsdecode(name)
+                offset += _INOTIFY_EVENT.size + length
+
+                if mask & _IN_Q_OVERFLOW:
+                    for folder in list(self._folder_wds):
+                        self._emit(folder, 'RESCAN')
+                    continue
+                folder = self._wd_folders.get(wd)
+                if folder is None:
+                    continue
+                if mask & (_IN_DELETE_SELF | _IN_MOVE_SELF | _IN_IGNORED):
+                    self._emit(folder, 'RESCAN')
+                elif not mask & _IN_ISDIR or name.startswith("."):
+                    continue
+                elif mask & _IN_CREATE:
+                    self._emit(folder, 'ADD', name)
+                elif mask & _IN_DELETE:
+                    self._emit(folder, 'REMOVE', name)
+                elif mask & _IN_MOVED_FROM:
+                    moved_from[cookie] = (folder, name)
+                elif mask & _IN_MOVED_TO:
+                    old = moved_from.pop(cookie, None)
+                    if old and old[0] == folder:
+                        self._emit(folder, 'RENAME', old[1], name)
+                    else:
+                        if old:
+                            self._emit(old[0], 'REMOVE', old[1])
+                        self._emit(folder, 'ADD', name)
+            # Moved out of every watched folder
+            for folder, name in moved_from.values():
+                self._emit(folder, 'REMOVE', name)
+
+    def _poll(self):
+        with self._lock:
+            polled = list(self._polled.items())
+        for folder, mtime_ns in polled:
+            try:
+                current_mtime = os.stat(folder).st_mtime_ns
+                if current_mtime == mtime_ns:
+                    continue
+                names = list_subfolders(folder) # Outside the lock, this is the slow part on a share
+            except OSError:
+                names = None
+            with self._lock:
+                if self._polled.get(folder) != mtime_ns:
+                    continue # Unwatched or re-watched meanwhile
+                if names is None:
+                    self._emit(folder, 'RESCAN')
+                    continue
+                self._polled[folder] = current_mtime
+                old = self._listings[folder]
+                removed, added = sorted(old - names), sorted(names - old)
+                if len(removed) == 1 and len(added) == 1:
+                    self._emit(folder, 'RENAME', removed[0], added[0])
+                else:
+                    for name in removed:
+                        self._emit(folder, 'REMOVE', name)
+                    for name in added:
+                        self._emit(folder, 'ADD', name)
+
+_watcher = None
+_watcher_clients = set()
+
+def get_watcher(client, start=True):
+    """The shared DirectoryWatcher, started on first use unless start is False. None when it isn't running."""
+    global _watcher
+    if _watcher is None and WATCH_ENABLED and start:
+        _watcher = DirectoryWatcher()
+    if _watcher is not None:
+        _watcher_clients.add(client)
+    return _watcher
+
+def stop_watcher(client):
+    """Release client's folders; the watcher stops with its last client (add-on unregister)."""
+    global _watcher
+    _watcher_clients.discard(client)
+    if _watcher is not None:
+        _watcher.forget(client)
+        if not _watcher_clients:
+            _watcher.close()
+            _watcher = None
+
+# --- Version Index ---
+# Each wip/publish folder keeps a small JSON index of the highest _v### per base name,
+# so saving and "Load Latest" don't have to list the whole folder on the share.
+# The index carries the folder mtime it was written against: any file added,
+# removed or renamed in the folder changes the folder mtime and invalidates it.
+VERSION_INDEX_FILENAME = ".version_index.json"
+# Rewrites of existing versions (dedup, recompress) are staged in this subfolder so the
+# temp file doesn't change the version folder's mtime
+VERSION_TMP_DIRNAME = ".pipeline_tmp"
+_version_index_lock = threading.RLock() # Saves and background rewrites both update the index
+
+def parse_version_filename(filename):
+    """Split 'base_v###.blend' into (base, number). Returns (None, None) for unversioned files."""
+    if not filename.endswith(".blend"):
+        return None, None
+    parts = filename[:-6].rsplit("_v", 1)
+    if len(parts) == 2 and parts[1].isdigit():
+        return parts[0], int(parts[1])
+    return None, None
+
+def _read_version_index(folder, validate=True):
+    """Return the stored {base_name: [number, filename]} map, or None if missing, unreadable or stale."""
+    index_path = os.path.join(folder, VERSION_INDEX_FILENAME)
+    try:
+        if validate and os.stat(index_path).st_mtime_ns != os.stat(folder).st_mtime_ns:
+            return None
+        with open(index_path, "r") as f:
+            return json.load(f)["versions"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+def _write_version_index(folder, versions):
+    """Atomically replace the folder's version index."""
+    with _version_index_lock:
+        index_path = os.path.join(folder, VERSION_INDEX_FILENAME)
+        tmp_path = f"{index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"versions": versions}, f)
+            os.replace(tmp_path, index_path)
+            # The rename itself bumps the folder mtime; stamp the index with the folder's
+            # resulting mtime so the pair can be compared exactly on the next read
+            folder_mtime_ns = os.stat(folder).st_mtime_ns
+            os.utime(index_path, ns=(folder_mtime_ns, folder_mtime_ns))
+        except OSError as e:
+            # Read-only publish folders etc. - callers still get the scanned result
+            print(f"Could not write version index {index_path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+def rebuild_version_index(folder):
+    """Full scan of folder; rewrites the index and returns {base_name: [number, filename]}."""
+    versions = {}
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            base, number = parse_version_filename(entry.name)
+            if base is not None and number > versions.get(base, [-1])[0]:
+                versions[base] = [number, entry.name]
+    _write_version_index(folder, versions)
+    return versions
+
+def load_version_index(folder):
+    """Return the folder's version map, rebuilding it from scratch if the index is missing or stale."""
+    versions = _read_version_index(folder)
+    if versions is None:
+        versions = rebuild_version_index(folder)
+    return versions
+
+def record_saved_version(folder, filename):
+    """Fold a freshly saved _v### file into the folder's index without rescanning.
+
+    Only valid straight after get_next_increment_filename() validated the index for
+    this folder - the save itself makes the index look stale, so it is read unchecked.
+    """
+    base, number = parse_version_filename(filename)
+    if base is None:
+        return
+    with _version_index_lock:
+        versions = _read_version_index(folder, validate=False)
+        if versions is None:
+            rebuild_version_index(folder)
+            return
+        if number > versions.get(base, [-1])[0]:
+            versions[base] = [number, filename]
+        _write_version_index(folder, versions)
+
+def version_tmp_path(path):
+    """Scratch file for rewriting path, in the folder's VERSION_TMP_DIRNAME subfolder (same filesystem)."""
+    tmp_dir = os.path.join(os.path.dirname(path), VERSION_TMP_DIRNAME)
+    os.makedirs(tmp_dir, exist_ok=True)
+    return os.path.join(tmp_dir, f"{os.path.basename(path)}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+def replace_version_file(tmp_path, path, remove=None):
+    """Move a rewritten version into place, keeping the folder's index valid if it was.
+
+    remove: a file deleted in the same step (a dedup manifest or the .blend it replaces).
+    Neither may be the folder's newest version, so the index's content stays right.
+    """
+    folder = os.path.dirname(path)
+    index_path = os.path.join(folder, VERSION_INDEX_FILENAME)
+    with _version_index_lock:
+        try:
+            was_current = os.stat(index_path).st_mtime_ns == os.stat(folder).st_mtime_ns
+        except OSError:
+            was_current = False
+        os.replace(tmp_path, path)
+        if remove is not None:
+            os.remove(remove)
+        if was_current: # Same versions, only their files changed
+            folder_mtime_ns = os.stat(folder).st_mtime_ns
+            os.utime(index_path, ns=(folder_mtime_ns, folder_mtime_ns))
+
+# --- Deduplicated Version Storage ---
+# Optional backend, off unless use_dedup_storage (or --dedup) is set: older _v### files
+# are split into content-defined chunks stored once per show in <series root>/.objects.
+# The .blend is then removed and only a small manifest listing its chunks stays, as
+# <name>_v###.blend.dedup next to where it was, so no path ending in .blend ever holds
+# something Blender can't open. A deduplicated version is gone for File > Open and for
+# library links until it is restored, so only enable this for folders nothing links into.
+# The newest DEDUP_KEEP_FULL versions always stay plain .blend files.
+# Restoring: materialize_version() rebuilds one version (Load Latest does this itself);
+# restore_deduplicated_versions() or the command line rebuilds every version in folders:
+#   blender -b -P Pipeline-AssetPublishTool.py -- restore-versions <folder> [...] --store <series root>/.objects
+DEDUP_STORE_DIRNAME = ".objects"
+DEDUP_KEEP_FULL = 1
+DEDUP_MAGIC = b"TPDEDUP1\n"
+DEDUP_MANIFEST_SUFFIX = ".dedup"
+CDC_WINDOW = 48                  # bytes in the rolling hash window
+CDC_MASK = (1 << 20) - 1         # cut where the window hash has these bits clear: ~1 MB average chunk
+CDC_MIN_SIZE = 256 * 1024
+CDC_MAX_SIZE = 4 * 1024 * 1024
+CDC_READ_SIZE = 4 * 1024 * 1024  # bytes read from the file at a time
+CDC_HASH_SLICE = 1024 * 1024     # bytes hashed per numpy pass, keeps the temporary arrays at a few MB
+# 32 bit sums wrap, but the mask only looks at the low bits, so cuts are the same as with 64 bit ones
+_CDC_GEAR = numpy.random.default_rng(0x5EED).integers(0, 1 << 32, 256, dtype=numpy.uint64).astype(numpy.uint32)
+
+def _cdc_candidates(data):
+    """Offsets just past every window whose hash has the CDC_MASK bits clear, in order."""
+    # Windowed sum of per-byte random values, vectorized through a prefix sum one slice at a
+    # time; a slice reads CDC_WINDOW bytes past its end so windows crossing into the next match
+    for start in range(0, len(data), CDC_HASH_SLICE):
+        segment = data[start:start + CDC_HASH_SLICE + CDC_WINDOW]
+        if len(segment) <= CDC_WINDOW:
+            break
+        prefix = numpy.cumsum(_CDC_GEAR[segment], dtype=numpy.uint32)
+        window = prefix[CDC_WINDOW:] - prefix[:-CDC_WINDOW]
+        yield from (numpy.flatnonzero((window & numpy.uint32(CDC_MASK)) == 0) + start + CDC_WINDOW + 1).tolist()
+
+def _cdc_cut_points(buf):
+    """Chunk end offsets in buf. The tail after the last cut is left for the next read."""
+    data = numpy.frombuffer(buf, dtype=numpy.uint8)
+    cuts, last = [], 0
+    for cut in _cdc_candidates(data):
+        while cut - last > CDC_MAX_SIZE:
+            last += CDC_MAX_SIZE
+            cuts.append(last)
+        if cut - last >= CDC_MIN_SIZE:
+            cuts.append(cut)
+            last = cut
+    while len(buf) - last > CDC_MAX_SIZE:
+        last += CDC_MAX_SIZE
+        cuts.append(last)
+    return cuts
+
+def _iter_chunks(f):
+    tail = b""
+    while True:
+        block = f.read(CDC_READ_SIZE)
+        if not block:
+            if tail:
+                yield tail
+            return
+        buf = tail + block
+        last = 0
+        for cut in _cdc_cut_points(buf):
+            yield buf[last:cut]
+            last = cut
+        tail = buf[last:]
+
+_file_locks = {} # path -> [lock, number of rewrites holding or waiting for it]
+_file_locks_guard = threading.Lock()
+
+@contextlib.contextmanager
+def _file_lock(path):
+    """Per-file lock so background rewrites of one version (dedup, recompress, rebuild) never overlap.
+
+    The entry is dropped again once no rewrite holds or waits for it.
+    """
+    with _file_locks_guard:
+        entry = _file_locks.setdefault(path, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _file_locks_guard:
+            entry[1] -= 1
+            if not entry[1]:
+                del _file_locks[path]
+
+def _chunk_path(store_dir, digest):
+    return os.path.join(store_dir, digest[:2], digest[2:])
+
+def dedup_manifest_path(path):
+    return path + DEDUP_MANIFEST_SUFFIX
+
+def is_dedup_manifest(path):
+    with open(path, "rb") as f:
+        return f.read(len(DEDUP_MAGIC)) == DEDUP_MAGIC
+
+def is_deduplicated(path):
+    """True when the version at path only exists as a manifest (and needs materialize_version)."""
+    if os.path.exists(path):
+        return is_dedup_manifest(path) # Written in place by older versions of this tool
+    return os.path.isfile(dedup_manifest_path(path))
+
+def _write_version_tmp(path, write):
+    """Write a scratch file for path via write(f) and return its path."""
+    tmp_path = version_tmp_path(path)
+    try:
+        with open(tmp_path, "wb") as f:
+            write(f)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return tmp_path
+
+def dedup_store_version(path, store_dir):
+    """Move a plain .blend into the chunk store, leaving only its manifest next to it. Returns bytes stored."""
+    with _file_lock(path):
+        return _dedup_store_version(path, store_dir)
+
+def _dedup_store_version(path, store_dir):
+    if not os.path.isfile(path) or is_dedup_manifest(path):
+        return 0
+    chunks, stored, file_hash = [], 0, hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in _iter_chunks(f):
+            file_hash.update(chunk)
+            digest = hashlib.sha256(chunk).hexdigest()
+            chunks.append(digest)
+            chunk_path = _chunk_path(store_dir, digest)
+            if not os.path.exists(chunk_path):
+                os.makedirs(os.path.dirname(chunk_path), exist_ok=True)
+                tmp_path = f"{chunk_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as out:
+                    out.write(chunk)
+                os.replace(tmp_path, chunk_path)
+                stored += len(chunk)
+    manifest = {"size": os.path.getsize(path), "sha256": file_hash.hexdigest(), "chunks": chunks}
+    tmp_path = _write_version_tmp(path, lambda f: f.write(DEDUP_MAGIC + json.dumps(manifest).encode()))
+    # The manifest lands before the .blend goes, so the version always exists in one form
+    replace_version_file(tmp_path, dedup_manifest_path(path), remove=path)
+    return stored
+
+def materialize_version(path, store_dir):
+    """Rebuild a deduplicated version back into the full .blend at path. No-op for plain files."""
+    with _file_lock(path):
+        return _materialize_version(path, store_dir)
+
+def _materialize_version(path, store_dir):
+    if not is_deduplicated(path):
+        return False
+    in_place = os.path.exists(path)
+    manifest_path = path if in_place else dedup_manifest_path(path)
+    with open(manifest_path, "rb") as f:
+        manifest = json.loads(f.read()[len(DEDUP_MAGIC):])
+
+    def write(out):
+        file_hash = hashlib.sha256()
+        for digest in manifest["chunks"]:
+            with open(_chunk_path(store_dir, digest), "rb") as chunk_file:
+                chunk = chunk_file.read()
+            file_hash.update(chunk)
+            out.write(chunk)
+        if file_hash.hexdigest() != manifest["sha256"]:
+            raise IOError(f"Chunk store is corrupt, cannot rebuild {path}")
+
+    tmp_path = _write_version_tmp(path, write)
+    replace_version_file(tmp_path, path, remove=None if in_place else manifest_path)
+    print(f"Rebuilt {path} from {len(manifest['chunks'])} stored chunks")
+    return True
+
+def restore_deduplicated_versions(folder, store_dir):
+    """Rebuild every deduplicated version in a folder. Returns the restored paths."""
+    restored = []
+    for name in sorted(os.listdir(folder)):
+        if name.endswith(".blend" + DEDUP_MANIFEST_SUFFIX):
+            name = name[:-len(DEDUP_MANIFEST_SUFFIX)]
+        elif not name.endswith(".blend"):
+            continue
+        path = os.path.join(folder, name)
+        if path not in restored and materialize_version(path, store_dir):
+            restored.append(path)
+    return restored
+
+def dedup_older_versions(folder, filename, store_dir, keep_full=DEDUP_KEEP_FULL):
+    """After saving filename, move the version that just left the keep window into the chunk store."""
+    base, number = parse_version_filename(filename)
+    if base is None or number <= keep_full:
+        return
+    old_path = os.path.join(folder, f"{base}_v{str(number - keep_full).zfill(3)}.blend")
+    if os.path.isfile(old_path):
+        start = time.perf_counter()
+        stored = dedup_store_version(old_path, store_dir)
+        print(f"Deduplicated {old_path}: {stored} new bytes stored ({time.perf_counter() - start:.2f}s)")
+
+# --- Save Policy ---
+# Save policy per save mode ("asset_library" is the Asset Library copy of a publish):
+#   compress       - Blender's own zstd compression while saving (slower save, smaller file)
+#   relative_remap - remap relative paths to the new file location
+#   local_first    - save a copy to LOCAL_SAVE_DIR, then move it onto the share (the session keeps its
+#                    current file path; only for files without paths relative to their own folder)
+#   recompress     - recompress at RECOMPRESS_LEVEL on a background thread pool after the save
+#                    (not for versions that dedup storage will store, chunking needs them uncompressed);
+#                    without the zstandard module or the zstd tool the save uses Blender's compression instead
+SAVE_POLICIES = {
+    "wip": {"compress": False, "relative_remap": True, "local_first": False, "recompress": False},
+    "publish": {"compress": False, "relative_remap": True, "local_first": False, "recompress": True},
+    "asset_library": {"compress": False, "relative_remap": True, "local_first": False, "recompress": True},
+}
+LOCAL_SAVE_DIR = os.path.join(tempfile.gettempdir(), "two_pints_save")
+RECOMPRESS_LEVEL = 6 # background pass: most of the size win of the high levels at a fraction of the CPU time
+RECOMPRESS_WORKERS = 2
+
+RECOMPRESS_FALLBACK_MESSAGE = ("Neither the zstandard module nor the zstd tool is available, "
+                               "publishes are saved with Blender's compression instead of recompressed")
+
+_recompress_backend = False # not looked up yet
+
+def recompress_backend():
+    """What recompression runs with on this machine: "zstandard", "zstd" (command line tool) or None."""
+    global _recompress_backend
+    if _recompress_backend is False:
+        if zstandard is not None:
+            _recompress_backend = "zstandard"
+        else:
+            _recompress_backend = "zstd" if shutil.which("zstd") else None
+    return _recompress_backend
+
+def recompress_fallback(mode, deduplicated=False):
+    """True if mode asks for a recompress that can't run here, so the save itself has to compress."""
+    return SAVE_POLICIES[mode]["recompress"] and not deduplicated and recompress_backend() is None
+
+def save_compressed(mode, deduplicated=False):
+    """Whether the Blender save for mode compresses."""
+    return SAVE_POLICIES[mode]["compress"] or recompress_fallback(mode, deduplicated)
+
+def save_blend(save_path, mode, deduplicated=False):
+    """Save the open file to save_path following SAVE_POLICIES[mode]; logs time and size.
+
+    deduplicated: dedup storage will store this version, it is never compressed for a missing recompress backend.
+    """
+    policy = SAVE_POLICIES[mode]
+    compress = save_compressed(mode, deduplicated)
+    start = time.perf_counter()
+    if policy["local_first"]:
+        # Session keeps its current file path, like a "Save Copy"
+        os.makedirs(LOCAL_SAVE_DIR, exist_ok=True)
+        local_path = os.path.join(LOCAL_SAVE_DIR, os.path.basename(save_path))
+        bpy.ops.wm.save_as_mainfile(filepath=local_path, copy=True,
+                                    compress=compress, relative_remap=policy["relative_remap"])
+        shutil.move(local_path, save_path)
+    else:
+        bpy.ops.wm.save_as_mainfile(filepath=save_path, copy=False,
+                                    compress=compress, relative_remap=policy["relative_remap"])
+    print(f"Save [{mode}] {save_path}: {os.path.getsize(save_path) / 1048576:.1f} MB in "
+          f"{time.perf_counter() - start:.2f}s (compress={compress}, local_first={policy['local_first']})")
+
+_post_save_pool = None
+
+def submit_post_save(fn, *args):
+    """Run fn(*args) on the background post-save thread pool (recompression, dedup)."""
+    global _post_save_pool
+    if _post_save_pool is None:
+        _post_save_pool = ThreadPoolExecutor(max_workers=RECOMPRESS_WORKERS, thread_name_prefix="post_save")
+
+    def run():
+        try:
+            fn(*args)
+        except Exception as e:
+            print(f"Post-save {fn.__name__}{args} failed: {e}")
+    _post_save_pool.submit(run)
+
+def queue_recompress(path, mode, deduplicated=False):
+    """Recompress path in the background if SAVE_POLICIES asks for it for this mode.
+
+    Versions that dedup will later move into the chunk store are left uncompressed:
+    compressed files share almost no chunks with each other.
+    Call after the folder's version index has been updated for the save.
+    """
+    if SAVE_POLICIES[mode]["recompress"] and not deduplicated and recompress_backend():
+        submit_post_save(recompress_blend, path)
+
+def recompress_blend(path, level=RECOMPRESS_LEVEL, expected_sha256=None):
+    """Rewrite an uncompressed .blend as a zstd stream, which Blender opens directly.
+
+    expected_sha256: checksum the file was verified against; it is skipped if it no longer matches.
+    The new file only replaces the old one after it decompresses back to the same checksum.
+    """
+    with _file_lock(path):
+        _recompress_blend(path, level, expected_sha256)
+
+def _stream_sha256(stream):
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(1 << 20), b""):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+def file_sha256(path):
+    """SHA-256 hex digest of a file, read in 1 MB chunks."""
+    with open(path, "rb") as f:
+        return _stream_sha256(f)
+
+def _zstd_content_sha256(path):
+    """SHA-256 of the decompressed content of a zstd file."""
+    if zstandard is not None:
+        with open(path, "rb") as f, zstandard.ZstdDecompressor().stream_reader(f) as reader:
+            return _stream_sha256(reader)
+    proc = subprocess.Popen(["zstd", "-q", "-d", "-c", path], stdout=subprocess.PIPE)
+    digest = _stream_sha256(proc.stdout)
+    if proc.wait():
+        raise IOError(f"zstd could not decompress {path}")
+    return digest
+
+def _recompress_blend(path, level, expected_sha256=None):
+    with open(path, "rb") as f:
+        if f.read(7) != b"BLENDER":
+            return # Already compressed, or a dedup manifest
+        f.seek(0)
+        source_sha256 = _stream_sha256(f)
+    if expected_sha256 and source_sha256 != expected_sha256:
+        print(f"Recompress skipped for {path}: it changed since it was verified")
+        return
+    start = time.perf_counter()
+    size_before = os.path.getsize(path)
+    tmp_path = version_tmp_path(path)
+    try:
+        backend = recompress_backend()
+        if backend == "zstandard":
+            compressor = zstandard.ZstdCompressor(level=level, threads=-1, write_checksum=True)
+            with open(path, "rb") as src, open(tmp_path, "wb") as dst:
+                compressor.copy_stream(src, dst)
+        elif backend == "zstd":
+            subprocess.run(["zstd", "-q", "-f", f"-{level}", "-T0", path, "-o", tmp_path], check=True)
+        else:
+            print(f"Recompress skipped for {path}: neither the zstandard module nor the zstd tool is available")
+            return
+        if _zstd_content_sha256(tmp_path) != source_sha256:
+            raise IOError("recompressed file does not decompress to the original")
+        replace_version_file(tmp_path, path)
+    except Exception as e:
+        print(f"Recompress failed for {path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return
+    print(f"Recompressed {path}: {size_before / 1048576:.1f} MB -> {os.path.getsize(path) / 1048576:.1f} MB "
+          f"in {time.perf_counter() - start:.2f}s")
+
+def shutdown_post_save_pool(wait=False):
+    global _post_save_pool
+    if _post_save_pool is not None:
+        _post_save_pool.shutdown(wait=wait)
+        _post_save_pool = None
+
+# --- Series Catalog ---
+# SQLite index of the asset/shot folders and _v### files under a series root.
+# Each folder row stores the folder mtime it was listed at; refreshing only
+# re-lists folders whose mtime changed, so an unchanged show costs one stat
+# per folder instead of a recursive crawl.
+# The database is local and per user (SQLite locking can't be trusted over SMB/NFS, and
+# every artist's scans would write the same file): each machine catalogs the share itself.
+CATALOG_DIR = os.environ.get("TWO_PINTS_CATALOG_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "two_pints", "catalogs")
+CATALOG_SCHEMA_VERSION = 1
+CATALOG_READ_TIMEOUT = 0.1 # seconds a read-only (UI) query waits for another process's write
+# Indexed trees: root (relative to the series root) -> (depth of the versioned folders, top-level names to skip)
+CATALOG_LAYOUT = {
+    "wip/Assets": (1, ()),
+    "publish/Assets": (1, ()),
+    "wip/Shots": (3, ()),
+    "publish": (3, ("Assets",)),
+}
+
+def catalog_path(series_root):
+    """Local catalog database of a series root, one file per root."""
+    key = os.path.normcase(os.path.abspath(series_root))
+    return os.path.join(CATALOG_DIR, hashlib.sha1(key.encode("utf-8")).hexdigest()[:16] + ".sqlite")
+
+class SeriesCatalog:
+    """Show-wide catalog of assets, shots, tasks and versions under a series root, kept in CATALOG_DIR."""
+
+    def __init__(self, series_root, readonly=False):
+        """readonly: query-only connection that gives up after CATALOG_READ_TIMEOUT, for UI draw code."""
+        self.series_root = series_root
+        self.db_path = catalog_path(series_root)
+        if readonly:
+            if not os.path.isfile(self.db_path):
+                raise sqlite3.OperationalError(f"no catalog written yet at {self.db_path}")
+            self.conn = sqlite3.connect(self.db_path, timeout=CATALOG_READ_TIMEOUT)
+            self.conn.execute("PRAGMA query_only = ON")
+        else:
+            os.makedirs(CATALOG_DIR, exist_ok=True)
+            self.conn = sqlite3.connect(self.db_path, timeout=10)
+            # Local file: readers keep reading while a refresh writes
+            self.conn.execute("PRAGMA journal_mode = WAL")
+            self._init_schema()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def _init_schema(self):
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] == CATALOG_SCHEMA_VERSION:
+            return
+        self.conn.executescript("DROP TABLE IF EXISTS dirs; DROP TABLE IF EXISTS versions;")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS dirs (
+                path TEXT PRIMARY KEY, parent TEXT, name TEXT, mtime_ns INTEGER);
+            CREATE INDEX IF NOT EXISTS dirs_parent ON dirs(parent);
+            CREATE TABLE IF NOT EXISTS versions (
+                path TEXT PRIMARY KEY, dir TEXT, base TEXT, task TEXT,
+                version INTEGER, size INTEGER, mtime_ns INTEGER);
+            CREATE INDEX IF NOT EXISTS versions_dir ON versions(dir);
+            CREATE INDEX IF NOT EXISTS versions_base ON versions(base, version);
+        """)
+        self.conn.execute(f"PRAGMA user_version = {CATALOG_SCHEMA_VERSION}")
+        self.conn.commit()
+
+    def relpath(self, path):
+        """Catalog key ('wip/Shots/EP01') for an absolute path, or None if it is outside the indexed trees."""
+        rel = os.path.relpath(os.path.abspath(path), os.path.abspath(self.series_root)).replace(os.sep, "/")
+        return rel if self._layout_position(rel) else None
+
+    def _layout_position(self, rel):
+        """(layout root, depth below it) for a catalog key, or None."""
+        for root in sorted(CATALOG_LAYOUT, key=len, reverse=True):
+            if rel == root:
+                return root, 0
+            if rel.startswith(root + "/"):
+                depth = rel.count("/") - root.count("/")
+                leaf_depth, skip = CATALOG_LAYOUT[root]
+                if depth > leaf_depth or rel[len(root) + 1:].split("/")[0] in skip:
+                    return None
+                return root, depth
+        return None
+
+    def _forget(self, rel):
+        """Drop a folder and everything indexed below it."""
+        # Range instead of LIKE: '_' in asset names would act as a wildcard
+        lo, hi = rel + "/", rel + "0"
+        self.conn.execute("DELETE FROM dirs WHERE path = ? OR (path >= ? AND path < ?)", (rel, lo, hi))
+        self.conn.execute("DELETE FROM versions WHERE dir = ? OR (dir >= ? AND dir < ?)", (rel, lo, hi))
+
+    def _rescan_dir(self, rel, mtime_ns):
+        root, depth = self._layout_position(rel)
+        leaf_depth, skip = CATALOG_LAYOUT[root]
+        abs_dir = os.path.join(self.series_root, *rel.split("/"))
+        asset_name = rel.rsplit("/", 1)[-1] if root.endswith("Assets") else None
+
+        subdirs, files = set(), []
+        with os.scandir(abs_dir) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if depth < leaf_depth and not (depth == 0 and entry.name in skip):
+                        subdirs.add(entry.name)
+                elif depth == leaf_depth:
+                    base, number = parse_version_filename(entry.name)
+                    if base is None:
+                        continue
+                    task = base[len(asset_name) + 1:] if asset_name and base.startswith(asset_name + "_") else None
+                    st = entry.stat()
+                    files.append((f"{rel}/{entry.name}", rel, base, task, number, st.st_size, st.st_mtime_ns))
+
+        known = {name for (name,) in self.conn.execute("SELECT name FROM dirs WHERE parent = ?", (rel,))}
+        for name in known - subdirs:
+            self._forget(f"{rel}/{name}")
+        # New folders get no mtime so their first sync always lists them
+        self.conn.executemany(
+            "INSERT INTO dirs (path, parent, name, mtime_ns) VALUES (?, ?, ?, NULL)",
+            [(f"{rel}/{name}", rel, name) for name in subdirs - known])
+        self.conn.execute("DELETE FROM versions WHERE dir = ?", (rel,))
+        self.conn.executemany("INSERT OR REPLACE INTO versions VALUES (?, ?, ?, ?, ?, ?, ?)", files)
+        parent, _, name = rel.rpartition("/") if depth else (None, None, rel)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO dirs (path, parent, name, mtime_ns) VALUES (?, ?, ?, ?)",
+            (rel, parent, name, mtime_ns))
+
+    def sync_dir(self, rel, commit=True):
+        """Re-list one folder if its mtime changed. Returns (subfolder names, rescanned), names None if missing."""
+        try:
+            mtime_ns = os.stat(os.path.join(self.series_root, *rel.split("/"))).st_mtime_ns
+        except OSError:
+            self._forget(rel)
+            if commit:
+                self.conn.commit()
+            return None, False
+        row = self.conn.execute("SELECT mtime_ns FROM dirs WHERE path = ?", (rel,)).fetchone()
+        rescanned = row is None or row[0] != mtime_ns
+        if rescanned:
+            self._rescan_dir(rel, mtime_ns)
+            if commit:
+                self.conn.commit()
+        return self.children(rel), rescanned
+
+    def refresh(self, roots=None, cancelled=None):
+        """Incrementally bring the given layout roots (default: all) up to date.
+
+        Returns (folders stat'ed, folders re-listed, seconds). cancelled() is checked between folders.
+        """
+        start = time.perf_counter()
+        visited = rescanned = 0
+        for root in roots or CATALOG_LAYOUT:
+            stack = [root]
+            while stack:
+                if cancelled and cancelled():
+                    break
+                rel = stack.pop()
+                children, changed = self.sync_dir(rel, commit=False)
+                visited += 1
+                rescanned += changed
+                if children:
+                    stack.extend(f"{rel}/{name}" for name in children)
+        self.conn.commit()
+        return visited, rescanned, time.perf_counter() - start
+
+    def is_current(self, rel):
+        """True if a folder is catalogued and unchanged on disk since (one stat, no writes)."""
+        try:
+            mtime_ns = os.stat(os.path.join(self.series_root, *rel.split("/"))).st_mtime_ns
+        except OSError:
+            return False
+        row = self.conn.execute("SELECT mtime_ns FROM dirs WHERE path = ?", (rel,)).fetchone()
+        return row is not None and row[0] == mtime_ns
+
+    def children(self, rel):
+        """Indexed subfolder names of a folder, without touching the disk."""
+        return [name for (name,) in self.conn.execute(
+            "SELECT name FROM dirs WHERE parent = ? ORDER BY name", (rel,))]
+
+    def latest_version(self, rel_dir, base):
+        """Catalog key of the highest indexed version of base in a folder, or None."""
+        row = self.conn.execute(
+            "SELECT path FROM versions WHERE dir = ? AND base = ? ORDER BY version DESC LIMIT 1",
+            (rel_dir, base)).fetchone()
+        return row[0] if row else None
+
+    def search(self, text, limit=200, roots=None):
+        """Indexed versions whose base name contains text: [(path, version, size, mtime_ns)], newest first per base.
+
+        roots: only versions below these catalog keys (e.g. ("wip/Assets", "publish/Assets")).
+        """
+        where, params = "instr(lower(base), lower(?)) > 0", [text]
+        if roots:
+            where += " AND (" + " OR ".join("(dir >= ? AND dir < ?)" for _ in roots) + ")"
+            for root in roots:
+                params += [root + "/", root + "0"]
+        return self.conn.execute(
+            f"SELECT path, version, size, mtime_ns FROM versions WHERE {where} "
+            "ORDER BY base, version DESC LIMIT ?", (*params, limit)).fetchall()
+
+# --- Catalog Access ---
+# UI code only reads the catalog, through a read-only connection that gives up after
+# CATALOG_READ_TIMEOUT, so a long write can't stall a redraw. Writes (refreshing, syncing
+# a listed folder) go through their own SeriesCatalog on a background thread.
+CATALOG_SEARCH_LIMIT = 20 # versions listed under a panel's search field
+CATALOG_SEARCH_TTL = 30.0 # seconds search results are reused by redraws
+_catalogs = {} # series root -> read-only SeriesCatalog, main thread only
+_search_cache = {} # (series root, text, roots) -> (time searched, rows), main thread only
+
+def get_catalog(series_root):
+    """Read-only catalog of a series root, opened once. None if there is none yet."""
+    catalog = _catalogs.get(series_root)
+    if catalog is None:
+        try:
+            catalog = _catalogs[series_root] = SeriesCatalog(series_root, readonly=True)
+        except (OSError, sqlite3.Error) as e:
+            print(f"Series catalog unavailable for {series_root}: {e}")
+            return None
+    return catalog
+
+def search_catalog(series_root, text, roots=None):
+    """Versions matching text as [(abs path, version, size)], cached for CATALOG_SEARCH_TTL so redraws don't re-query."""
+    key = (series_root, text, roots)
+    now = time.monotonic()
+    cached = _search_cache.get(key)
+    if cached and now - cached[0] < CATALOG_SEARCH_TTL:
+        return cached[1]
+    rows = []
+    catalog = get_catalog(series_root)
+    if catalog:
+        try:
+            rows = [(os.path.join(series_root, *path.split("/")), version, size)
+                    for path, version, size, _ in catalog.search(text, limit=CATALOG_SEARCH_LIMIT, roots=roots)]
+        except sqlite3.Error as e:
+            print(f"Series catalog search failed: {e}")
+    # Keeps the last search per roots filter (one per panel) of this series root
+    for old_key in [k for k in _search_cache if k[0] != series_root or k[2] == roots]:
+        del _search_cache[old_key]
+    _search_cache[key] = (now, rows)
+    return rows
+
+def clear_catalog_search():
+    _search_cache.clear()
+
+def close_catalogs():
+    for catalog in _catalogs.values():
+        catalog.close()
+    _catalogs.clear()
+
+def get_latest_version(directory, base_name, catalog=None):
+    """Full path of the latest _v### of base_name in directory, or None.
+
+    Asks the catalog when it has the folder and the folder is unchanged since; otherwise the version index.
+    """
+    if not os.path.isdir(directory):
+        return None
+    rel = catalog.relpath(directory) if catalog else None
+    if rel is not None:
+        try:
+            if catalog.is_current(rel):
+                latest = catalog.latest_version(rel, base_name)
+                return os.path.join(catalog.series_root, *latest.split("/")) if latest else None
+        except sqlite3.Error as e:
+            print(f"Series catalog lookup failed for {directory}: {e}")
+    latest = load_version_index(directory).get(base_name)
+    return os.path.join(directory, latest[1]) if latest else None
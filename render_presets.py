@@ -0,0 +1,105 @@
+"""
+Render setting presets, shared by the render setup and preview scripts.
+
+A preset maps RNA paths relative to a scene to values, e.g. "cycles.samples": 64 or
+'view_layers["ViewLayer"].use': False. Each script passes its built-in presets to
+load_render_presets; more can be dropped as <name>.json / <name>.toml into a folder of
+RENDER_PRESET_DIRS (nested tables are joined with dots, so [cycles] samples = 64 works too;
+write subscripts as a quoted key: ['view_layers["ViewLayer"]']).
+
+Not an add-on: the scripts next to it put their own folder on sys.path and import it.
+"""
+import os
+import json
+import math
+import time
+import tomllib
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+RENDER_PRESET_DIRS = [os.path.join(SCRIPT_DIR, "render_presets")]
+RENDER_PRESET_DIRS += [p for p in os.environ.get("TWO_PINTS_RENDER_PRESETS", "").split(os.pathsep) if p]
+
+def _flatten_preset(values, prefix=""):
+    flat = {}
+    for key, value in values.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(_flatten_preset(value, path))
+        else:
+            flat[path] = value
+    return flat
+
+def load_render_presets(builtin=None, directories=None):
+    """The builtin presets plus any <name>.json / <name>.toml found in the preset folders (files win)."""
+    presets = {name: dict(values) for name, values in (builtin or {}).items()}
+    for directory in directories if directories is not None else RENDER_PRESET_DIRS:
+        if not os.path.isdir(directory):
+            continue
+        for entry in sorted(os.listdir(directory)):
+            name, ext = os.path.splitext(entry)
+            try:
+                if ext == ".json":
+                    with open(os.path.join(directory, entry), "r", encoding="utf-8") as f:
+                        presets[name] = _flatten_preset(json.load(f))
+                elif ext == ".toml":
+                    with open(os.path.join(directory, entry), "rb") as f:
+                        presets[name] = _flatten_preset(tomllib.load(f))
+            except (OSError, ValueError) as e:
+                print(f"Skipped render preset {entry}: {e}")
+    return presets
+
+def _split_rna_path(path):
+    """'eevee.ray_tracing_options.use_denoise' -> ('eevee.ray_tracing_options', 'use_denoise'), ignoring dots inside ["..."]."""
+    depth = 0
+    for i in range(len(path) - 1, -1, -1):
+        char = path[i]
+        if char == "]":
+            depth += 1
+        elif char == "[":
+            depth -= 1
+        elif char == "." and depth == 0:
+            return path[:i], path[i + 1:]
+    return "", path
+
+def compile_render_preset(values):
+    """Parse a preset's RNA paths once: [(owner path, property, value)] in preset order."""
+    return [_split_rna_path(path) + (value,) for path, value in values.items()]
+
+def _same_value(current, value):
+    if isinstance(current, float) and isinstance(value, (int, float)):
+        return math.isclose(current, value, rel_tol=1e-6, abs_tol=1e-6) # stored as 32 bit floats
+    if not isinstance(current, (str, bool, int, float)) and hasattr(current, "__len__"):
+        return len(current) == len(value) and all(_same_value(c, v) for c, v in zip(current, value))
+    return current == value
+
+def apply_render_preset(scene, compiled, dry_run=False):
+    """Set every preset value that differs on scene.
+
+    Each owner struct (scene.cycles, scene.render.ffmpeg, ...) is resolved once. Returns
+    (changes [(path, old, new)], skipped [(path, reason)], seconds).
+    """
+    start = time.perf_counter()
+    owners = {"": scene}
+    changes = []
+    skipped = []
+    for owner_path, prop, value in compiled:
+        path = f"{owner_path}.{prop}" if owner_path else prop
+        owner = owners.get(owner_path)
+        if owner is None:
+            try:
+                owner = owners[owner_path] = scene.path_resolve(owner_path)
+            except ValueError:
+                skipped.append((path, f"'{owner_path}' not found"))
+                continue
+        try:
+            current = getattr(owner, prop)
+            if _same_value(current, value):
+                continue
+            if not dry_run:
+                setattr(owner, prop, value)
+        except (AttributeError, TypeError, ValueError) as e:
+            skipped.append((path, str(e))) # e.g. a property this Blender version doesn't have
+            continue
+        changes.append((path, current, value))
+    return changes, skipped, time.perf_counter() - start
+